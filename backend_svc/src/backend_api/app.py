@@ -1,99 +1,235 @@
 # src/backend_api/app.py
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import List, Tuple
-import logging, json
-
-from src.backend_api.tools import TOOLS, dispatch_tool
-from src.backend_api.prompts import (
-    build_initial_system_prompt,
-    build_followup_system_prompt
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+import asyncio, logging, json, os
+
+from src.backend_api import metrics
+from src.backend_api.budget import DeadlineExceeded, LatencyBudget
+from src.backend_api.cache_warming import run_cache_warmer
+from src.backend_api.cancellation import CancelToken, RequestCancelled, active_requests, current_cancel
+from src.backend_api.config import (
+    ADMIN_TOKEN,
+    CACHE_WARM_ENABLED,
+    CANCEL_ABANDONED_REQUESTS,
+    DISCONNECT_POLL_SECONDS,
+    PROFILING_ENABLED,
+    RECORD_PATH,
+    REQUEST_BUDGET_SECONDS,
+    WARMUP_ENABLED,
 )
-from src.backend_api.ollama_client import call_ollama
-from src.backend_api.utils import summarize_tool_results
+from src.backend_api import profiling
+from src.backend_api.pipeline import bind_request, stream_answer, within_deadline
+from src.backend_api.recorder import TrafficRecorder
+from src.backend_api.schemas import ChatRequest, ChatResponse
+from src.backend_api.trace import RequestTrace, server_timing, start_trace, timing_summary
+from src.backend_api.warmup import READINESS, run_warmup
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger("backend_api")
 
-app = FastAPI(title="Backend Service")
 
-class ChatRequest(BaseModel):
-    message: str
-    history: List[Tuple[str, str]] = []
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /health answers while /ready stays 503
+    warmup_task = None
+    if WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(run_warmup())
+    else:
+        READINESS["ready"] = True
+    # Keep popular searches cached ahead of demand
+    warmer_task = asyncio.create_task(run_cache_warmer()) if CACHE_WARM_ENABLED else None
+    yield
+    if warmup_task:
+        warmup_task.cancel()
+    if warmer_task:
+        warmer_task.cancel()
 
-class ChatResponse(BaseModel):
-    response: str
 
+app = FastAPI(title="Backend Service", lifespan=lifespan)
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
-    logger.debug(f"Received message: {request.message}")
-    logger.debug(f"Chat history: {request.history}")
-
-    # Build messages for initial call
-    initial_system_prompt = build_initial_system_prompt(request.message)
+if RECORD_PATH:
+    # Replay these traces with `python -m src.backend_api.bench.replay`
+    app.add_middleware(TrafficRecorder, path=RECORD_PATH)
 
-    # Only include past LLM responses (not tool outputs!)
-    messages = [{"role": "system", "content": initial_system_prompt}]
-    for user_msg, assistant_msg in request.history:
-        messages.append({"role": "user", "content": user_msg})
-        messages.append({"role": "assistant", "content": assistant_msg})
+if PROFILING_ENABLED:
+    app.add_middleware(profiling.RequestProfiler)
 
-    # Current user message
-    messages.append({"role": "user", "content": request.message})
-    logger.debug(f"initial_messages: {messages}")
 
-    try:
-        # ---- Step 1: Initial LLM call ----
-        initial_resp = call_ollama(messages, tools=TOOLS)
-        logger.debug(f"initial_resp: {initial_resp}")
+def timeout_message(budget: LatencyBudget) -> str:
+    return f"Sorry, no answer could be produced within {budget.seconds:g} seconds. Please try again."
 
-        assistant_msg = initial_resp.get("message", {})
-        tool_calls = assistant_msg.get("tool_calls", [])
 
-        # OPTION B — Only ONE tool call allowed
-        if not tool_calls:
-            final_answer = assistant_msg.get("content", "")
-            return ChatResponse(response=final_answer)
+def cancelled_message(token: CancelToken) -> str:
+    if token.reason == "superseded":
+        return "Cancelled: a newer message was sent in this conversation."
+    return "Cancelled: the client disconnected."
 
-        tool_call = tool_calls[0]  # Only first tool call is supported
-        tool_name = tool_call["function"]["name"]
-        tool_args = tool_call["function"].get("arguments", {})
 
-        # ---- Step 2: Run the tool ----
-        tool_output = dispatch_tool(tool_name, tool_args)
-        logger.debug(f"Tool result: {tool_name} {tool_args} -> {tool_output}")
+def start_cancellation(request: ChatRequest, budget: LatencyBudget, trace: RequestTrace) -> CancelToken:
+    """
+    Token for this request's upstream work, also inherited by its worker
+    threads. A newer request on the same session cancels it.
+    """
+    token = CancelToken(budget, trace)
+    current_cancel.set(token)
+    if CANCEL_ABANDONED_REQUESTS:
+        active_requests.begin(request.session_id, token)
+    return token
 
-        # Summarize for the follow-up pass
-        summarized_tool_text = summarize_tool_results(tool_output, request.message)
 
-        # ---- Step 3: Follow-up LLM call ----
-        past_llm_history = "\n".join([f"User: {u}\nAssistant: {a}" for u, a in request.history])
-
-        followup_prompt = build_followup_system_prompt(
-            latest_user_message=request.message,
-            summarized_tool_results=summarized_tool_text,
-            chat_history=past_llm_history
-        )
+async def watch_disconnect(http_request: Request, token: CancelToken) -> None:
+    while not token.cancelled:
+        if await http_request.is_disconnected():
+            token.cancel("disconnect")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
 
-        followup_messages = [
-            {"role": "system", "content": followup_prompt},
-            {"role": "user", "content": request.message},
-            {
-                "role": "tool",
-                "tool_call_id": tool_call["id"],
-                "content": json.dumps(tool_output)
-            }
-        ]
 
-        logger.debug(f"followup_messages: {followup_messages}")
+def finish_timings(trace: RequestTrace) -> dict:
+    summary = timing_summary(trace)
+    if "bound" in summary:
+        metrics.incr(f"requests.{summary['bound']}_bound")
+    return summary
 
-        followup_resp = call_ollama(followup_messages)
-        logger.debug(f"followup_resp: {followup_resp}")
 
-        final_answer = followup_resp.get("message", {}).get("content", "")
-        return ChatResponse(response=final_answer)
+@app.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(request: ChatRequest, response: Response, http_request: Request):
+    budget = LatencyBudget(request.timeout_seconds or REQUEST_BUDGET_SECONDS)
+    trace = start_trace()
+    bind_request(request, budget)
+    token = start_cancellation(request, budget, trace)
+    # Nothing is sent before the answer is complete, so poll for a disconnect
+    watcher = asyncio.create_task(watch_disconnect(http_request, token)) if CANCEL_ABANDONED_REQUESTS else None
+    try:
+        chunks = [chunk async for chunk in within_deadline(stream_answer(request, budget), budget, token)]
+        final_answer = "".join(chunks)
+        logger.debug(f"final_answer: {final_answer}")
+        timings = finish_timings(trace)
+        response.headers["Server-Timing"] = server_timing(timings)
+        return ChatResponse(response=final_answer, timings=timings if request.include_timings else None)
 
     except Exception as e:
+        if isinstance(e, RequestCancelled) or token.cancelled:
+            logger.info(f"{cancelled_message(token)} ({budget.elapsed():.1f}s in): {request.message}")
+            return JSONResponse(
+                status_code=499,
+                content={"response": cancelled_message(token), "error": "cancelled"}
+            )
+        # Upstream timeouts caused by the deadline count as the deadline
+        if isinstance(e, DeadlineExceeded) or budget.expired():
+            logger.warning(f"Deadline exceeded after {budget.elapsed():.1f}s: {request.message}")
+            metrics.incr("requests.deadline_exceeded")
+            return JSONResponse(
+                status_code=504,
+                content={"response": timeout_message(budget), "error": "deadline_exceeded"},
+                headers={"Server-Timing": server_timing(timing_summary(trace))}
+            )
         logger.error(f"Ollama error: {e}", exc_info=True)
-        return ChatResponse(response=f"Ollama error: {e}")
+        metrics.incr("requests.upstream_errors")
+        return JSONResponse(
+            status_code=502,
+            content={"response": f"Ollama error: {e}", "error": "upstream_error"},
+            headers={"Server-Timing": server_timing(timing_summary(trace))}
+        )
+
+    finally:
+        if watcher:
+            watcher.cancel()
+        active_requests.end(request.session_id, token)
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Same pipeline as /chat, streamed as NDJSON lines:
+    {"delta": ...} while the answer is generated, then {"done": true, "response": ...}
+    (with "timings" if requested) or {"error": ..., "code": ...}. Headers go out before
+    the answer exists, so timings are not sent as Server-Timing here.
+    A newer message on the same session ends the stream with
+    {"error": ..., "code": "cancelled"}.
+    """
+    budget = LatencyBudget(request.timeout_seconds or REQUEST_BUDGET_SECONDS)
+    trace = start_trace()
+
+    async def events():
+        # Set here: this generator runs in the response's task, not the endpoint's
+        bind_request(request, budget)
+        token = start_cancellation(request, budget, trace)
+        answer = ""
+        finished = False
+        try:
+            async for chunk in within_deadline(stream_answer(request, budget), budget, token):
+                answer += chunk
+                yield json.dumps({"delta": chunk}) + "\n"
+            done = {"done": True, "response": answer}
+            timings = finish_timings(trace)
+            if request.include_timings:
+                done["timings"] = timings
+            finished = True
+            yield json.dumps(done) + "\n"
+        except Exception as e:
+            finished = True
+            if isinstance(e, RequestCancelled) or token.cancelled:
+                logger.info(f"{cancelled_message(token)} ({budget.elapsed():.1f}s in): {request.message}")
+                yield json.dumps({"error": cancelled_message(token), "code": "cancelled"}) + "\n"
+                return
+            if isinstance(e, DeadlineExceeded) or budget.expired():
+                logger.warning(f"Deadline exceeded after {budget.elapsed():.1f}s: {request.message}")
+                metrics.incr("requests.deadline_exceeded")
+                yield json.dumps({"error": timeout_message(budget), "code": "deadline_exceeded"}) + "\n"
+                return
+            logger.error(f"Ollama error: {e}", exc_info=True)
+            metrics.incr("requests.upstream_errors")
+            yield json.dumps({"error": f"Ollama error: {e}", "code": "upstream_error"}) + "\n"
+        finally:
+            # Closed early: the client went away mid-answer
+            if not finished and CANCEL_ABANDONED_REQUESTS:
+                token.cancel("disconnect")
+            active_requests.end(request.session_id, token)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/health")
+async def health_endpoint():
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready_endpoint():
+    status = "ready" if READINESS["ready"] else "warming_up"
+    return JSONResponse(
+        status_code=200 if READINESS["ready"] else 503,
+        content={"status": status, "steps": READINESS["steps"]}
+    )
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return metrics.snapshot()
+
+
+def check_admin(token):
+    # Admin routes stay closed until a token is configured
+    if not ADMIN_TOKEN or token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+if PROFILING_ENABLED:
+    @app.get("/admin/profiles")
+    async def list_profiles_endpoint(x_admin_token: str = Header(default="")):
+        check_admin(x_admin_token)
+        return profiling.list_profiles()
+
+    @app.get("/admin/profiles/{profile_id}")
+    async def get_profile_endpoint(profile_id: str, kind: str = "collapsed", x_admin_token: str = Header(default="")):
+        """
+        kind: "collapsed" (folded stacks for flamegraph tools), "prof"
+        (cProfile/pstats dump of the event loop thread) or "json" (summary).
+        """
+        check_admin(x_admin_token)
+        path = profiling.profile_file(profile_id, kind)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, media_type=profiling.PROFILE_KINDS[kind], filename=os.path.basename(path))
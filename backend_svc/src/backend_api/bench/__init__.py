@@ -0,0 +1 @@
+# src/backend_api/bench/__init__.py
@@ -0,0 +1,219 @@
+# src/backend_api/bench/replay.py
+"""
+Replay recorded traffic (RECORD_PATH JSONL) against the backend wired to
+local Ollama/SearXNG stand-ins that reproduce the recorded decisions and
+upstream latencies, and report latency and throughput.
+
+    cd backend_svc
+    python -m src.backend_api.bench.replay traffic.jsonl --speed 4 --out report.json
+    python -m src.backend_api.bench.replay traffic.jsonl --compare report.json
+
+Backend settings (SEMANTIC_CACHE_ENABLED, AGENT_MAX_STEPS, OLLAMA_PROFILES,
+...) are taken from the environment, so the same traces can be replayed per
+configuration. The Ollama stand-in honours each call profile's num_predict,
+so the report's "ollama" section shows the decode time a profile saves.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from src.backend_api.bench.stubs import (
+    TraceBook,
+    free_port,
+    make_ollama_stub,
+    make_searxng_stub,
+    start_server,
+)
+
+
+def load_traces(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        traces = [json.loads(line) for line in f if line.strip()]
+    return sorted(traces, key=lambda t: t["ts"])
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "mean": round(statistics.fmean(ordered), 4),
+        "p50": round(rank(50), 4),
+        "p90": round(rank(90), 4),
+        "p95": round(rank(95), 4),
+        "p99": round(rank(99), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def tool_path(trace: dict) -> str:
+    tools = [e["name"] for e in trace.get("ev", []) if e["k"] == "tool"]
+    return "+".join(tools) or "direct"
+
+
+def start_backend(book: TraceBook):
+    """
+    Start the stand-ins and the backend in this process; returns the
+    backend base URL and the Ollama stand-in. The backend reads its
+    upstream URLs at import time, so it is imported only after the
+    environment points at the stubs.
+    """
+    ollama_port, searxng_port, backend_port = free_port(), free_port(), free_port()
+    ollama_stub = make_ollama_stub(book)
+    start_server(ollama_stub, ollama_port)
+    start_server(make_searxng_stub(book), searxng_port)
+
+    os.environ["OLLAMA_URL"] = f"http://127.0.0.1:{ollama_port}/api/chat"
+    os.environ["SEARCHXNG_URL"] = f"http://127.0.0.1:{searxng_port}/search"
+    os.environ.setdefault("CACHE_PATH", os.path.join(tempfile.mkdtemp(), "replay_cache.sqlite3"))
+    os.environ["WARMUP_ENABLED"] = "0"
+    os.environ["RECORD_PATH"] = ""
+
+    from src.backend_api.app import app
+    start_server(app, backend_port)
+    return f"http://127.0.0.1:{backend_port}", ollama_stub
+
+
+def send(base_url: str, trace: dict, session: requests.Session) -> dict:
+    payload = {"message": trace["msg"], "history": trace.get("hist", [])}
+    if trace.get("to"):
+        payload["timeout_seconds"] = trace["to"]
+    result = {"path": tool_path(trace), "recorded": trace.get("lat")}
+    started = time.monotonic()
+    try:
+        if trace.get("ep") == "/chat/stream":
+            with session.post(base_url + "/chat/stream", json=payload, stream=True, timeout=600) as resp:
+                result["status"] = resp.status_code
+                for line in resp.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if "delta" in event and "ttfb" not in result:
+                        result["ttfb"] = time.monotonic() - started
+                    if "error" in event:
+                        result["error"] = event.get("code", "error")
+        else:
+            resp = session.post(base_url + "/chat", json=payload, timeout=600)
+            result["status"] = resp.status_code
+            if resp.status_code != 200 or resp.json().get("error"):
+                result["error"] = resp.json().get("error") or f"http_{resp.status_code}"
+    except Exception as e:
+        result["error"] = type(e).__name__
+    result["latency"] = time.monotonic() - started
+    return result
+
+
+def replay(traces: List[dict], base_url: str, speed: float, concurrency: int) -> dict:
+    """
+    Send every trace, spaced as recorded divided by `speed` (0 = as fast
+    as `concurrency` allows).
+    """
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+    first_ts = traces[0]["ts"]
+    started = time.monotonic()
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for trace in traces:
+            if speed > 0:
+                delay = (trace["ts"] - first_ts) / speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(pool.submit(send, base_url, trace, session))
+        results = [f.result() for f in futures]
+    wall = time.monotonic() - started
+    return build_report(results, wall, speed, concurrency)
+
+
+def build_report(results: List[dict], wall: float, speed: float, concurrency: int) -> dict:
+    from src.backend_api import config
+
+    ok = [r for r in results if not r.get("error")]
+    by_path = {}
+    for path in sorted({r["path"] for r in results}):
+        group = [r for r in ok if r["path"] == path]
+        by_path[path] = {
+            "requests": len([r for r in results if r["path"] == path]),
+            "latency": percentiles([r["latency"] for r in group]),
+            "recorded_latency": percentiles([r["recorded"] for r in group if r.get("recorded") is not None]),
+        }
+    errors = {}
+    for r in results:
+        if r.get("error"):
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(ok) / wall, 3) if wall else 0.0,
+        "latency": percentiles([r["latency"] for r in ok]),
+        "ttfb": percentiles([r["ttfb"] for r in ok if "ttfb" in r]),
+        "by_path": by_path,
+        "replay": {"speed": speed, "concurrency": concurrency},
+        "config": {k: os.environ[k] for k in dir(config) if k.isupper() and k in os.environ},
+    }
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """
+    Side-by-side table of the headline numbers of two reports.
+    """
+    rows = [("throughput_rps", baseline.get("throughput_rps"), current.get("throughput_rps"))]
+    for section in ("latency", "ttfb"):
+        for stat in ("p50", "p90", "p99", "max"):
+            rows.append((f"{section}.{stat}", baseline.get(section, {}).get(stat), current.get(section, {}).get(stat)))
+    lines = [f"{'metric':<18}{'baseline':>12}{'current':>12}{'change':>10}"]
+    for name, old, new in rows:
+        if old is None or new is None:
+            continue
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        lines.append(f"{name:<18}{old:>12.3f}{new:>12.3f}{change:>10}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("traces", help="JSONL file written by the backend with RECORD_PATH set")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Arrival-time speed-up (1 = original timing, 0 = no pauses)")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiply the recorded upstream latencies by this factor")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline report to diff against")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.traces)
+    if not traces:
+        sys.exit("No traces to replay")
+
+    base_url, ollama_stub = start_backend(TraceBook(traces, args.latency_scale))
+    report = replay(traces, base_url, args.speed, args.concurrency)
+    report["ollama"] = {kind: {**u, "seconds": round(u["seconds"], 3)} for kind, u in ollama_stub.state.usage.items()}
+    from src.backend_api.profiles import PROFILES
+    report["profiles"] = PROFILES
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(json.load(f), report))
+
+
+if __name__ == "__main__":
+    main()
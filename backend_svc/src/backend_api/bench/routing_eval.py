@@ -0,0 +1,201 @@
+# src/backend_api/bench/routing_eval.py
+"""
+Score routers on a labeled corpus of queries: how often each one picks the
+right tool (get_weather, get_date, searchxng or none), whether it fills in
+sensible arguments, and how long a decision takes.
+
+    cd backend_svc
+    python -m src.backend_api.bench.routing_eval --stub --out routing.json
+    OLLAMA_URL=http://localhost:11434/api/chat python -m src.backend_api.bench.routing_eval --routers llm,rules
+    python -m src.backend_api.bench.routing_eval --stub --compare routing.json
+
+The "llm" router sends the same prompt, tools and `route` profile as the
+first agent step. With --stub it talks to the local Ollama stand-in, which
+routes unseen queries by keyword and charges latency for prompt size, so
+prompt or tool-schema changes show up without a model. "llm-subset" offers
+only the tools select_tools() picks (TOOL_SUBSET_ENABLED), and
+"llm-session" uses the static system prompt of session mode
+(SESSION_REUSE_ENABLED). All of them honour AGENT_MAX_STEPS like the
+pipeline does. The "rules" router is the keyword baseline from routing.py.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+from src.backend_api.bench.replay import percentiles
+from src.backend_api.bench.stubs import TraceBook, free_port, make_ollama_stub, start_server
+from src.backend_api.routing import NO_TOOL, RouteDecision, rule_route
+from src.backend_api.utils import tokenize
+
+LABELS = ["get_weather", "get_date", "searchxng", NO_TOOL]
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "routing_corpus.jsonl")
+# Share of the labeled query's words a search query must contain
+MIN_QUERY_OVERLAP = 0.5
+
+
+def load_corpus(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def llm_router(subset: bool = False, static_system: bool = False) -> Callable[[dict], RouteDecision]:
+    # Imported here: the Ollama client reads OLLAMA_URL at import time
+    from src.backend_api.config import AGENT_MAX_STEPS, TOOL_SUBSET_MAX
+    from src.backend_api.ollama_client import call_ollama
+    from src.backend_api.prompts import build_routing_messages
+    from src.backend_api.routing import decision_from_response
+    from src.backend_api.tool_selection import select_tools
+    from src.backend_api.tools import TOOLS
+
+    def route(case: dict) -> RouteDecision:
+        history = case.get("history", [])
+        names = select_tools(case["query"], history, TOOL_SUBSET_MAX) if subset else None
+        tools = [t for t in TOOLS if names is None or t["function"]["name"] in names]
+        # The prompt the first agent step sends (chaining rules included)
+        messages = build_routing_messages(case["query"], history, max_tool_calls=AGENT_MAX_STEPS,
+                                          static_system=static_system, tools=names)
+        return decision_from_response(call_ollama(messages, tools=tools, profile="route"))
+
+    return route
+
+
+def rules_router() -> Callable[[dict], RouteDecision]:
+    return lambda case: rule_route(case["query"])
+
+
+ROUTERS = {
+    "llm": llm_router,
+    "llm-subset": lambda: llm_router(subset=True),
+    "llm-session": lambda: llm_router(static_system=True),
+    "rules": rules_router,
+}
+
+
+def arguments_match(case: dict, decision: RouteDecision) -> bool:
+    """
+    Whether a correctly chosen tool also got usable arguments.
+    """
+    expected = case.get("args") or {}
+    if decision.tool == "get_weather":
+        return str(decision.arguments.get("location", "")).strip().lower() == expected.get("location", "").lower()
+    if decision.tool == "searchxng":
+        wanted = set(tokenize(expected.get("query", "")))
+        got = set(tokenize(str(decision.arguments.get("query", ""))))
+        return not wanted or len(wanted & got) / len(wanted) >= MIN_QUERY_OVERLAP
+    return True
+
+
+def evaluate(route: Callable[[dict], RouteDecision], corpus: List[dict], repeat: int) -> dict:
+    confusion = {expected: {predicted: 0 for predicted in LABELS + ["error"]} for expected in LABELS}
+    latencies = []
+    argument_hits = correct = 0
+    misses = []
+    for case in corpus:
+        expected = case.get("tool") or NO_TOOL
+        for _ in range(repeat):
+            started = time.monotonic()
+            try:
+                decision = route(case)
+                predicted = decision.label if decision.label in LABELS else "error"
+            except Exception as e:
+                decision, predicted = None, "error"
+                misses.append({"query": case["query"], "expected": expected, "error": type(e).__name__})
+            latencies.append(time.monotonic() - started)
+            confusion[expected][predicted] += 1
+            if predicted == expected:
+                correct += 1
+                if arguments_match(case, decision):
+                    argument_hits += 1
+                else:
+                    misses.append({"query": case["query"], "expected": expected, "arguments": decision.arguments})
+            elif decision is not None:
+                misses.append({"query": case["query"], "expected": expected, "predicted": predicted})
+
+    total = len(corpus) * repeat
+    per_label = {}
+    for label in LABELS:
+        true_positives = confusion[label][label]
+        predicted = sum(confusion[e][label] for e in LABELS)
+        actual = sum(confusion[label].values())
+        per_label[label] = {
+            "precision": round(true_positives / predicted, 3) if predicted else None,
+            "recall": round(true_positives / actual, 3) if actual else None,
+        }
+    return {
+        "cases": total,
+        "accuracy": round(correct / total, 3) if total else 0.0,
+        "argument_accuracy": round(argument_hits / correct, 3) if correct else None,
+        "latency": percentiles(latencies),
+        "per_label": per_label,
+        "confusion": confusion,
+        "misses": misses,
+    }
+
+
+def format_confusion(confusion: Dict[str, Dict[str, int]]) -> str:
+    columns = LABELS + ["error"]
+    lines = [f"{'expected / predicted':<22}" + "".join(f"{c:>13}" for c in columns)]
+    for expected in LABELS:
+        lines.append(f"{expected:<22}" + "".join(f"{confusion[expected][c]:>13}" for c in columns))
+    return "\n".join(lines)
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """
+    Accuracy and latency of every router in both reports.
+    """
+    lines = [f"{'metric':<28}{'baseline':>12}{'current':>12}"]
+    for router in sorted(set(baseline.get("routers", {})) & set(current.get("routers", {}))):
+        old, new = baseline["routers"][router], current["routers"][router]
+        rows = [("accuracy", old["accuracy"], new["accuracy"]),
+                ("argument_accuracy", old["argument_accuracy"], new["argument_accuracy"])]
+        rows += [(f"latency.{s}", old["latency"].get(s), new["latency"].get(s)) for s in ("p50", "p90", "p99")]
+        for name, a, b in rows:
+            if a is not None and b is not None:
+                lines.append(f"{router + '.' + name:<28}{a:>12.3f}{b:>12.3f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Labeled JSONL: query, tool (or null), args")
+    parser.add_argument("--routers", default="llm,rules", help=f"Comma-separated, from: {', '.join(ROUTERS)}")
+    parser.add_argument("--stub", action="store_true", help="Point the llm router at the local Ollama stand-in")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Scale the stand-in's latencies")
+    parser.add_argument("--repeat", type=int, default=1, help="Route every query this many times")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline report to diff against")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    names = [n.strip() for n in args.routers.split(",") if n.strip()]
+    unknown = [n for n in names if n not in ROUTERS]
+    if not corpus or unknown:
+        sys.exit(f"Unknown routers: {', '.join(unknown)}" if unknown else "Empty corpus")
+
+    if args.stub:
+        port = free_port()
+        start_server(make_ollama_stub(TraceBook([], args.latency_scale)), port)
+        os.environ["OLLAMA_URL"] = f"http://127.0.0.1:{port}/api/chat"
+
+    report = {"corpus": args.corpus, "stub": args.stub, "routers": {}}
+    for name in names:
+        result = evaluate(ROUTERS[name](), corpus, args.repeat)
+        report["routers"][name] = result
+        print(f"== {name}: accuracy {result['accuracy']}, arguments {result['argument_accuracy']}, "
+              f"p50 {result['latency'].get('p50')}s, p90 {result['latency'].get('p90')}s")
+        print(format_confusion(result["confusion"]))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(json.load(f), report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# src/backend_api/bench/stubs.py
+"""
+Local stand-ins for Ollama and SearXNG used by the benchmark tools.
+They answer from recorded traces (same decisions, same latencies) so the
+backend can be exercised without a model or the internet.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from src.backend_api.routing import NO_TOOL, rule_route
+
+DEFAULT_ROUTE_SECONDS = 0.5
+DEFAULT_ANSWER_SECONDS = 1.0
+DEFAULT_SEARCH_SECONDS = 0.3
+# Prompt processing cost for messages with no recording (~4 chars per token)
+PREFILL_SECONDS_PER_KCHAR = 0.05
+EMBED_DIM = 256
+
+
+def normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9<>]+", text.lower()))
+
+
+class TraceBook:
+    """
+    Recorded behaviour looked up by the user message: for each routing
+    round the tool the model chose and how long the call took, the
+    answer and its latency, and how long each search took.
+    """
+
+    def __init__(self, traces: List[dict], latency_scale: float = 1.0):
+        self.latency_scale = latency_scale
+        self.by_message: Dict[str, dict] = {}
+        self.search_seconds: Dict[str, float] = {}
+        for trace in traces:
+            self.by_message[normalize(trace["msg"])] = trace
+            for event in trace.get("ev", []):
+                if event["k"] != "tool":
+                    continue
+                args = event.get("args") or {}
+                if event.get("name") == "searchxng" and "query" in args:
+                    self.search_seconds[normalize(args["query"])] = event["s"]
+                elif event.get("name") == "get_weather" and "location" in args:
+                    self.search_seconds[normalize(f"weather in {args['location']}")] = event["s"]
+
+    def find(self, message: str) -> Optional[dict]:
+        return self.by_message.get(normalize(message))
+
+    def routing(self, message: str, step: int, prompt_chars: int = 0) -> dict:
+        """
+        {"seconds", "tool_call" (or None), "content", "timings"} for the
+        step-th routing call of this message. Messages with no recording
+        are routed by the keyword rules, with a latency that grows with
+        the prompt size.
+        """
+        trace = self.find(message)
+        if trace is None:
+            prefill = prompt_chars / 1000 * PREFILL_SECONDS_PER_KCHAR
+            decision = rule_route(message) if step == 0 else None
+            tool_call = None
+            if decision and decision.tool:
+                tool_call = {"name": decision.tool, "arguments": decision.arguments}
+            timings = {"prompt_eval_count": prompt_chars // 4, "prompt_eval_duration": int(prefill * 1e9)}
+            return {"seconds": (DEFAULT_ROUTE_SECONDS + prefill) * self.latency_scale, "tool_call": tool_call,
+                    "content": f"Stub answer to: {message}", "timings": timings}
+
+        route_calls = [e for e in trace["ev"] if e["k"] == "llm" and e.get("tools")]
+        tool_events = [e for e in trace["ev"] if e["k"] == "tool"]
+        call = route_calls[step] if step < len(route_calls) else {"s": DEFAULT_ROUTE_SECONDS}
+        tool_call = None
+        if step < len(tool_events):
+            tool_call = {"name": tool_events[step]["name"], "arguments": tool_events[step].get("args") or {}}
+        return {"seconds": call["s"] * self.latency_scale, "tool_call": tool_call,
+                "content": trace.get("resp", ""), "timings": _timings_of(call)}
+
+    def answer(self, message: str) -> dict:
+        trace = self.find(message)
+        if trace is None:
+            return {"seconds": DEFAULT_ANSWER_SECONDS * self.latency_scale,
+                    "content": f"Stub answer to: {message}", "timings": {}}
+        answer_calls = [e for e in trace["ev"] if e["k"] == "llm" and not e.get("tools")]
+        call = answer_calls[-1] if answer_calls else {"s": DEFAULT_ANSWER_SECONDS}
+        return {"seconds": call["s"] * self.latency_scale, "content": trace.get("resp", ""),
+                "timings": _timings_of(call)}
+
+    def search(self, query: str) -> float:
+        return self.search_seconds.get(normalize(query), DEFAULT_SEARCH_SECONDS) * self.latency_scale
+
+
+def _timings_of(event: dict) -> dict:
+    return {k: v for k, v in event.items() if k.endswith("_count") or k.endswith("_duration")}
+
+
+def _last_user_message(messages: list) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return message.get("content", "")
+    return ""
+
+
+def _embedding(text: str) -> list:
+    # Deterministic bag-of-words vector: similar wording -> similar vectors
+    vector = np.zeros(EMBED_DIM, dtype=np.float32)
+    for word in normalize(text).split():
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % EMBED_DIM] += 1.0
+    return vector.tolist()
+
+
+def apply_num_predict(plan: dict, num_predict: Optional[int]) -> dict:
+    """
+    Cut a recorded generation down to `num_predict` tokens, removing the
+    matching share of its decode time, as Ollama would.
+    """
+    eval_count = plan["timings"].get("eval_count")
+    if not num_predict or num_predict < 0 or not eval_count or eval_count <= num_predict:
+        return plan
+    kept = num_predict / eval_count
+    decode_seconds = plan["timings"].get("eval_duration", 0) / 1e9
+    words = plan["content"].split()
+    timings = {**plan["timings"], "eval_count": num_predict,
+               "eval_duration": int(plan["timings"].get("eval_duration", 0) * kept)}
+    return {**plan, "seconds": max(0.0, plan["seconds"] - decode_seconds * (1 - kept)),
+            "content": " ".join(words[:max(1, int(len(words) * kept))]),
+            "timings": timings, "done_reason": "length"}
+
+
+async def _batch_routing(app: FastAPI, book: TraceBook, payload: dict, message: str) -> dict:
+    """
+    Structured-output routing of a batch of queries: recorded decisions
+    where there are any, keyword rules otherwise, for one prefill of the
+    whole prompt plus a short decode per query.
+    """
+    queries = json.loads(message)["queries"]
+    prompt_chars = len(json.dumps(payload["messages"]))
+    seconds = (DEFAULT_ROUTE_SECONDS + prompt_chars / 1000 * PREFILL_SECONDS_PER_KCHAR
+               + 0.02 * len(queries)) * book.latency_scale
+    decisions = []
+    for query in queries:
+        plan = book.routing(query["query"], 0)
+        call = plan["tool_call"]
+        decision = {"id": query["id"], "tool": call["name"] if call else NO_TOOL}
+        if call:
+            decision.update({k: v for k, v in call["arguments"].items() if k in ("location", "query")})
+        decisions.append(decision)
+
+    usage = app.state.usage.setdefault("route_batch", {"calls": 0, "seconds": 0.0, "eval_count": 0})
+    usage["calls"] += 1
+    usage["seconds"] += seconds
+    await asyncio.sleep(seconds)
+    return {"model": payload.get("model"), "done": True, "done_reason": "stop",
+            "message": {"role": "assistant", "content": json.dumps({"decisions": decisions})}}
+
+
+def make_ollama_stub(book: TraceBook) -> FastAPI:
+    app = FastAPI(title="Ollama stub")
+    # Simulated work per kind of call ("route", "answer"), for reports
+    app.state.usage = {}
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "stub"}
+
+    @app.post("/api/embed")
+    async def embed(request: Request):
+        payload = await request.json()
+        texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        return {"model": payload.get("model"), "embeddings": [_embedding(t) for t in texts]}
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        payload = await request.json()
+        messages = payload.get("messages", [])
+        if not messages:
+            # Model pre-load request
+            return {"model": payload.get("model"), "done": True, "message": {"role": "assistant", "content": ""}}
+
+        message = _last_user_message(messages)
+        if payload.get("format"):
+            return await _batch_routing(app, book, payload, message)
+        kind = "route" if payload.get("tools") else "answer"
+        if kind == "route":
+            # Tool results of this turn (session transcripts keep earlier ones)
+            last_user = max(i for i, m in enumerate(messages) if m.get("role") == "user")
+            step = sum(1 for m in messages[last_user:] if m.get("role") == "tool")
+            prompt_chars = len(json.dumps(messages)) + len(json.dumps(payload["tools"]))
+            plan = book.routing(message, step, prompt_chars)
+        else:
+            plan = {**book.answer(message), "tool_call": None}
+        if not plan["tool_call"]:
+            plan = apply_num_predict(plan, payload.get("options", {}).get("num_predict"))
+
+        usage = app.state.usage.setdefault(kind, {"calls": 0, "seconds": 0.0, "eval_count": 0})
+        usage["calls"] += 1
+        usage["seconds"] += plan["seconds"]
+        usage["eval_count"] += plan["timings"].get("eval_count", 0)
+
+        assistant = {"role": "assistant", "content": "" if plan["tool_call"] else plan["content"]}
+        if plan["tool_call"]:
+            assistant["tool_calls"] = [{"id": f"call_{step}", "function": plan["tool_call"]}]
+        final = {"model": payload.get("model"), "done": True,
+                 "done_reason": plan.get("done_reason", "stop"), **plan["timings"]}
+
+        if not payload.get("stream"):
+            await asyncio.sleep(plan["seconds"])
+            return {**final, "message": assistant}
+
+        async def chunks():
+            words = re.findall(r"\S+\s*", assistant["content"]) or [""]
+            for word in words:
+                await asyncio.sleep(plan["seconds"] / len(words))
+                yield json.dumps({"message": {"role": "assistant", "content": word}, "done": False}) + "\n"
+            done = {**final, "message": {"role": "assistant", "content": ""}}
+            if plan["tool_call"]:
+                done["message"]["tool_calls"] = assistant["tool_calls"]
+            yield json.dumps(done) + "\n"
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+def make_searxng_stub(book: TraceBook) -> FastAPI:
+    app = FastAPI(title="SearXNG stub")
+
+    @app.get("/healthz")
+    async def healthz():
+        return PlainTextResponse("OK")
+
+    @app.get("/search")
+    async def search(q: str = "", format: str = "json"):
+        await asyncio.sleep(book.search(q))
+        results = [
+            {
+                "title": f"Result {i} for {q}",
+                "url": f"https://example.org/{i}/{normalize(q).replace(' ', '-')}",
+                "content": f"Stub snippet {i} about {q}. " * 8,
+                "engine": "stub",
+                "score": 1.0 / i,
+            }
+            for i in range(1, 6)
+        ]
+        return JSONResponse({"query": q, "number_of_results": len(results), "results": results})
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port: int) -> uvicorn.Server:
+    """
+    Serve `app` on 127.0.0.1:port from a daemon thread; returns once it
+    accepts connections. Set `server.should_exit = True` to stop it.
+    """
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
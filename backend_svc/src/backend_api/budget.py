@@ -0,0 +1,103 @@
+# src/backend_api/budget.py
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Starting guesses (seconds) until real calls have been observed
+DEFAULT_ESTIMATES = {
+    "route": 5.0,
+    "tool": 3.0,
+    "answer": 8.0,
+}
+
+
+class LatencyEstimator:
+    """
+    Exponentially weighted moving average of observed step latencies,
+    per step kind ("route", "tool", "answer").
+    """
+
+    def __init__(self, defaults: Dict[str, float], alpha: float = 0.2):
+        self.estimates = dict(defaults)
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        # Kinds with at least one real observation (others are still guesses)
+        self.observed = set()
+
+    def observe(self, kind: str, seconds: float) -> None:
+        with self.lock:
+            previous = self.estimates.get(kind)
+            if previous is None or kind not in self.observed:
+                # The first real observation replaces the starting guess
+                self.estimates[kind] = seconds
+            else:
+                self.estimates[kind] = previous + self.alpha * (seconds - previous)
+            self.observed.add(kind)
+
+    def expected(self, kind: str) -> float:
+        with self.lock:
+            return self.estimates.get(kind, 0.0)
+
+    def measured(self, kind: str) -> float:
+        """
+        Like expected(), but 0 until a call of this kind has been observed.
+        """
+        with self.lock:
+            return self.estimates.get(kind, 0.0) if kind in self.observed else 0.0
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, seconds: float):
+        super().__init__(f"Request deadline of {seconds:g}s exceeded")
+        self.seconds = seconds
+
+
+class LatencyBudget:
+    """
+    Wall-clock budget for one request. It is also the request's hard
+    deadline: outbound calls only get the time that is left.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.seconds - self.elapsed())
+
+    def fits(self, seconds: float) -> bool:
+        return self.remaining() >= seconds
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+# Budget of the request being served; worker threads started with
+# asyncio.to_thread inherit it.
+current_budget: ContextVar[Optional[LatencyBudget]] = ContextVar("current_budget", default=None)
+
+
+def call_timeout(default: float) -> float:
+    """
+    Timeout for an outbound call: `default`, capped by what is left of
+    the current request's deadline. Raises DeadlineExceeded if none is left.
+    """
+    budget = current_budget.get()
+    if budget is None:
+        return default
+    if budget.expired():
+        raise DeadlineExceeded(budget.seconds)
+    return min(default, budget.remaining())
+
+
+def check_deadline() -> None:
+    budget = current_budget.get()
+    if budget is not None and budget.expired():
+        raise DeadlineExceeded(budget.seconds)
+
+
+estimator = LatencyEstimator(DEFAULT_ESTIMATES)
@@ -0,0 +1,172 @@
+# src/backend_api/cache.py
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from src.backend_api import metrics
+from src.backend_api.config import CACHE_ENABLED, CACHE_MAX_BYTES, CACHE_PATH
+
+logger = logging.getLogger("cache")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace   TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    expires_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at);
+"""
+
+# Reads only refresh accessed_at when it is older than this, to keep
+# hot keys from turning every read into a write.
+_TOUCH_INTERVAL = 30.0
+# Run eviction once every this many writes (per process).
+_EVICT_EVERY = 100
+_EVICT_LOW_WATERMARK = 0.9
+
+
+class CacheStore:
+    """
+    Key/value store in a single SQLite file in WAL mode, so several
+    uvicorn workers (or containers on a shared volume) can read and
+    write it concurrently. Values are JSON, entries carry a TTL, and the
+    least recently used entries are evicted above `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT value, accessed_at FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        value, accessed_at = row
+        if now - accessed_at > _TOUCH_INTERVAL:
+            self._conn().execute(
+                "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key)
+            )
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        encoded = json.dumps(value)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, size, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (namespace, key, encoded, len(encoded), now + ttl, now)
+        )
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % _EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._conn().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def evict(self) -> None:
+        """
+        Drop expired entries, then least recently used ones until the
+        store fits in max_bytes.
+        """
+        conn = self._conn()
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to the low watermark so we don't evict again on the next write
+        excess = total - int(self.max_bytes * _EVICT_LOW_WATERMARK)
+        deleted = conn.execute(
+            "DELETE FROM entries WHERE rowid IN ("
+            "  SELECT rowid FROM ("
+            "    SELECT rowid, size, SUM(size) OVER (ORDER BY accessed_at, rowid) AS running"
+            "    FROM entries"
+            "  ) WHERE running - size < ?"
+            ")",
+            (excess,)
+        ).rowcount
+        metrics.incr("cache.evictions", deleted)
+
+
+class Cache:
+    """
+    One namespace of the shared store ("search", "route", "answer", ...)
+    with its default TTL. Keys are arbitrary strings; failures of the
+    store are logged and treated as misses so caching never breaks a request.
+    """
+
+    def __init__(self, store: Optional[CacheStore], namespace: str, ttl: float):
+        self.store = store
+        self.namespace = namespace
+        self.ttl = ttl
+
+    @staticmethod
+    def _hash(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.store is None:
+            return None
+        try:
+            value = self.store.get(self.namespace, self._hash(key))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed ({self.namespace}): {e}")
+            value = None
+        metrics.incr(f"cache.{self.namespace}.lookups")
+        if value is not None:
+            metrics.incr(f"cache.{self.namespace}.hits")
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.set(self.namespace, self._hash(key), value, self.ttl if ttl is None else ttl)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed ({self.namespace}): {e}")
+
+    def delete(self, key: str) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.delete(self.namespace, self._hash(key))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache delete failed ({self.namespace}): {e}")
+
+
+STORE = CacheStore(CACHE_PATH, CACHE_MAX_BYTES) if CACHE_ENABLED else None
+
+
+def get_cache(namespace: str, ttl: float) -> Cache:
+    metrics.register_ratio(f"cache.{namespace}.hit_rate",
+                           f"cache.{namespace}.hits", f"cache.{namespace}.lookups")
+    return Cache(STORE, namespace, ttl)
@@ -0,0 +1,150 @@
+# src/backend_api/cache_warming.py
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.backend_api import metrics
+from src.backend_api.config import (
+    CACHE_WARM_HALF_LIFE,
+    CACHE_WARM_INTERVAL,
+    CACHE_WARM_MIN_COUNT,
+    CACHE_WARM_RATE,
+    CACHE_WARM_TOP_K,
+    SEARCH_CACHE_TTL,
+)
+
+logger = logging.getLogger("cache_warming")
+
+# Re-run a query once its last refresh is this share of the TTL old
+REFRESH_AGE = 0.8 * SEARCH_CACHE_TTL
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class CountMinSketch:
+    """
+    Approximate counts in fixed memory: each key bumps one cell per row
+    and its count is the smallest of those cells (never an underestimate).
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.float64)
+        self._rows = np.arange(depth)
+
+    def _cells(self, key: str) -> np.ndarray:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint32) % self.width
+
+    def add(self, key: str, count: float = 1.0) -> float:
+        cells = self._cells(key)
+        self.table[self._rows, cells] += count
+        return float(self.table[self._rows, cells].min())
+
+    def estimate(self, key: str) -> float:
+        return float(self.table[self._rows, self._cells(key)].min())
+
+    def decay(self, factor: float) -> None:
+        self.table *= factor
+
+
+class PopularityTracker:
+    """
+    Top-K most requested queries. Counts come from a count-min sketch, so
+    memory stays bounded however many distinct queries arrive; only the
+    current leaders are kept by name (with the latest spelling seen, which
+    is the one the cache is keyed on).
+    """
+
+    def __init__(self, k: int, half_life: float, capacity_factor: int = 4):
+        self.k = k
+        self.capacity = k * capacity_factor
+        self.half_life = half_life
+        self.sketch = CountMinSketch()
+        # normalized query -> [estimated count, query as last sent]
+        self.leaders: Dict[str, list] = {}
+        self._decayed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def observe(self, query: str) -> None:
+        key = normalize_query(query)
+        if not key:
+            return
+        with self._lock:
+            count = self.sketch.add(key)
+            if key in self.leaders:
+                self.leaders[key] = [count, query]
+                return
+            if len(self.leaders) < self.capacity:
+                self.leaders[key] = [count, query]
+                return
+            weakest = min(self.leaders, key=lambda k: self.leaders[k][0])
+            if count > self.leaders[weakest][0]:
+                del self.leaders[weakest]
+                self.leaders[key] = [count, query]
+
+    def decay(self) -> None:
+        """
+        Age all counts by the time passed since the last call.
+        """
+        with self._lock:
+            now = time.monotonic()
+            factor = 0.5 ** ((now - self._decayed_at) / self.half_life) if self.half_life > 0 else 1.0
+            self._decayed_at = now
+            self.sketch.decay(factor)
+            for entry in self.leaders.values():
+                entry[0] *= factor
+
+    def top(self, n: int, min_count: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Up to `n` (query, estimated count) pairs, most popular first.
+        """
+        with self._lock:
+            ranked = sorted(self.leaders.values(), key=lambda e: e[0], reverse=True)
+        return [(query, count) for count, query in ranked[:n] if count >= min_count]
+
+
+popularity = PopularityTracker(CACHE_WARM_TOP_K, CACHE_WARM_HALF_LIFE)
+
+
+async def run_cache_warmer(tracker: PopularityTracker = popularity):
+    """
+    Every CACHE_WARM_INTERVAL seconds, refresh the cached results of the
+    most popular queries whose last refresh is getting old, spacing the
+    searches to stay within CACHE_WARM_RATE per second.
+    """
+    # Imported here: the tools package imports this module to count queries
+    from src.backend_api.tools.searchxng import search_results
+
+    refreshed_at: Dict[str, float] = {}
+    spacing = 1.0 / CACHE_WARM_RATE if CACHE_WARM_RATE > 0 else 0.0
+    while True:
+        await asyncio.sleep(CACHE_WARM_INTERVAL)
+        tracker.decay()
+        hot = tracker.top(CACHE_WARM_TOP_K, CACHE_WARM_MIN_COUNT)
+        hot_keys = {normalize_query(query) for query, _ in hot}
+        for key in list(refreshed_at):
+            if key not in hot_keys:
+                del refreshed_at[key]
+
+        for query, count in hot:
+            key = normalize_query(query)
+            if time.monotonic() - refreshed_at.get(key, -math.inf) < REFRESH_AGE:
+                continue
+            try:
+                await asyncio.to_thread(search_results, query, refresh=True)
+                metrics.incr("cache_warm.refreshes")
+            except Exception as e:
+                metrics.incr("cache_warm.errors")
+                logger.warning(f"Refreshing '{query}' (~{count:.0f} requests) failed: {e}")
+            refreshed_at[key] = time.monotonic()
+            await asyncio.sleep(spacing)
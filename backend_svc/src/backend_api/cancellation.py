@@ -0,0 +1,124 @@
+# src/backend_api/cancellation.py
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from src.backend_api import metrics
+from src.backend_api.budget import LatencyBudget, estimator
+from src.backend_api.trace import RequestTrace
+
+
+class RequestCancelled(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"Request cancelled ({reason})")
+        self.reason = reason
+
+
+# Pipeline phases still to come after the one in flight
+_LATER_PHASES = {"route": ("tool", "answer"), "tool": ("answer",), "answer": ()}
+
+
+def remaining_seconds(trace: RequestTrace) -> float:
+    """
+    Expected upstream time the request still had ahead of it: the rest of
+    the phase in flight plus the phases after it, from measured latencies
+    only (phases never observed count as 0, not as their starting guess).
+    """
+    if trace.phase is None:
+        return 0.0
+    in_phase = time.monotonic() - trace.phase_started
+    seconds = max(0.0, estimator.measured(trace.phase) - in_phase)
+    return seconds + sum(estimator.measured(p) for p in _LATER_PHASES[trace.phase])
+
+
+class CancelToken:
+    """
+    Set once the client of a request is gone ("disconnect") or has sent a
+    newer message on the same session ("superseded"). Worker threads poll
+    it between chunks; the event loop can await it.
+    """
+
+    def __init__(self, budget: LatencyBudget, trace: RequestTrace):
+        self.budget = budget
+        self.trace = trace
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._waiter: Optional[asyncio.Future] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str) -> None:
+        """
+        Call from the event loop. Only the first call counts.
+        """
+        if self._event.is_set():
+            return
+        self.reason = reason
+        self._event.set()
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(reason)
+        metrics.incr(f"requests.cancelled.{reason}")
+        if self.trace.phase is not None:
+            metrics.incr(f"cancel.during.{self.trace.phase}")
+        saved = min(remaining_seconds(self.trace), self.budget.remaining())
+        metrics.incr("cancel.estimated_seconds_saved", round(saved, 3))
+
+    def wait(self) -> asyncio.Future:
+        """
+        Future that resolves (to the reason) when the token is cancelled.
+        """
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+            if self.cancelled:
+                self._waiter.set_result(self.reason)
+        return self._waiter
+
+
+# Token of the request being served; worker threads started with
+# asyncio.to_thread inherit it.
+current_cancel: ContextVar[Optional[CancelToken]] = ContextVar("current_cancel", default=None)
+
+
+def check_cancelled() -> None:
+    token = current_cancel.get()
+    if token is not None and token.cancelled:
+        raise RequestCancelled(token.reason)
+
+
+def cancellable(chunks: Iterator) -> Iterator:
+    """
+    Pass `chunks` through, raising RequestCancelled before the next one
+    once the current request is cancelled.
+    """
+    for chunk in chunks:
+        check_cancelled()
+        yield chunk
+
+
+class ActiveRequests:
+    """
+    The request in flight for each session. Starting a new one cancels
+    the previous: its user has moved on to the next message.
+    """
+
+    def __init__(self):
+        self._tokens: Dict[str, CancelToken] = {}
+
+    def begin(self, session_id: Optional[str], token: CancelToken) -> None:
+        if session_id is None:
+            return
+        previous = self._tokens.get(session_id)
+        self._tokens[session_id] = token
+        if previous is not None:
+            previous.cancel("superseded")
+
+    def end(self, session_id: Optional[str], token: CancelToken) -> None:
+        if session_id is not None and self._tokens.get(session_id) is token:
+            del self._tokens[session_id]
+
+
+active_requests = ActiveRequests()
@@ -0,0 +1,158 @@
+# src/backend_api/config.py
+import os
+import tempfile
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+# Speculative search: start a searchxng call with the raw user message
+# while the routing LLM call is still running.
+SPECULATIVE_SEARCH = env_bool("SPECULATIVE_SEARCH", False)
+# Minimum token overlap between the raw message and the model's query
+# for the speculative result to be reused.
+SPECULATIVE_MIN_SIMILARITY = env_float("SPECULATIVE_MIN_SIMILARITY", 0.5)
+
+# Connections kept per upstream host (Ollama, SearXNG).
+HTTP_POOL_SIZE = env_int("HTTP_POOL_SIZE", 16)
+
+# Startup warm-up: pre-load models, open connections and run one routing
+# call before /ready reports ready.
+WARMUP_ENABLED = env_bool("WARMUP_ENABLED", True)
+# Models to load at startup (comma separated); defaults to OLLAMA_MODEL.
+WARMUP_MODELS = [m.strip() for m in os.getenv("WARMUP_MODELS", "").split(",") if m.strip()]
+WARMUP_CONNECTIONS = env_int("WARMUP_CONNECTIONS", 4)
+WARMUP_RETRY_SECONDS = env_float("WARMUP_RETRY_SECONDS", 5.0)
+# How long Ollama keeps a model loaded after a request.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# Disk-backed cache shared by all workers (put it on a shared volume).
+CACHE_ENABLED = env_bool("CACHE_ENABLED", True)
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join(tempfile.gettempdir(), "backend_svc_cache.sqlite3"))
+CACHE_MAX_BYTES = env_int("CACHE_MAX_BYTES", 64 * 1024 * 1024)
+# Seconds a cached SearXNG result set stays valid.
+SEARCH_CACHE_TTL = env_float("SEARCH_CACHE_TTL", 600.0)
+# Routing decisions (tool + arguments, or answer directly) for a
+# normalized message; a hit skips the first LLM call.
+ROUTE_CACHE_ENABLED = env_bool("ROUTE_CACHE_ENABLED", False)
+ROUTE_CACHE_TTL = env_float("ROUTE_CACHE_TTL", 86400.0)
+
+# Semantic answer cache: reuse the answer of a recent, near-identical
+# question (cosine similarity of Ollama embeddings).
+SEMANTIC_CACHE_ENABLED = env_bool("SEMANTIC_CACHE_ENABLED", False)
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+SEMANTIC_CACHE_THRESHOLD = env_float("SEMANTIC_CACHE_THRESHOLD", 0.92)
+SEMANTIC_CACHE_SIZE = env_int("SEMANTIC_CACHE_SIZE", 2048)
+SEMANTIC_CACHE_TTL = env_float("SEMANTIC_CACHE_TTL", 900.0)
+
+# Local retrieval memory: answer searchxng calls from passages of
+# earlier search results when they cover the query well enough.
+SEARCH_MEMORY_ENABLED = env_bool("SEARCH_MEMORY_ENABLED", False)
+SEARCH_MEMORY_PASSAGES = env_int("SEARCH_MEMORY_PASSAGES", 4096)
+SEARCH_MEMORY_MAX_AGE = env_float("SEARCH_MEMORY_MAX_AGE", 3600.0)
+# Fraction of the query's content words a passage must contain.
+SEARCH_MEMORY_MIN_COVERAGE = env_float("SEARCH_MEMORY_MIN_COVERAGE", 0.8)
+
+# Agent loop: how many routing/tool rounds a request may chain, and the
+# wall-clock budget (seconds) that decides whether another round fits.
+# Chaining is opt-in: every extra round costs a routing call, even when
+# the model decides after the first tool that it is done.
+AGENT_MAX_STEPS = env_int("AGENT_MAX_STEPS", 1)
+REQUEST_BUDGET_SECONDS = env_float("REQUEST_BUDGET_SECONDS", 60.0)
+
+# Traffic recording for offline replay: JSONL file of anonymized
+# requests, tool decisions, upstream latencies and answers (unset = off).
+RECORD_PATH = os.getenv("RECORD_PATH", "")
+RECORD_MAX_RESPONSE_CHARS = env_int("RECORD_MAX_RESPONSE_CHARS", 2000)
+
+# Per-call generation profiles: JSON (inline or a file path) overriding
+# the defaults in profiles.py, e.g.
+# {"route": {"options": {"num_predict": 64}, "format": "json"}}
+OLLAMA_PROFILES = os.getenv("OLLAMA_PROFILES", "")
+
+# Search mode: "aggregate" sends one request and waits for SearXNG's
+# merged response; "fanout" queries each target separately and returns
+# as soon as enough good results are in.
+SEARCH_MODE = os.getenv("SEARCH_MODE", "aggregate")
+# Engines ("duckduckgo") or categories ("category:news"), comma separated.
+SEARCH_FANOUT_TARGETS = [t.strip() for t in os.getenv("SEARCH_FANOUT_TARGETS", "duckduckgo,brave,wikipedia,bing").split(",") if t.strip()]
+SEARCH_FANOUT_BUDGET_SECONDS = env_float("SEARCH_FANOUT_BUDGET_SECONDS", 3.0)
+SEARCH_FANOUT_WORKERS = env_int("SEARCH_FANOUT_WORKERS", 32)
+
+# Most bytes of a SearXNG response body read while looking for results.
+SEARCH_MAX_RESPONSE_BYTES = env_int("SEARCH_MAX_RESPONSE_BYTES", 512 * 1024)
+
+# Per-request profiling: requests with the X-Profile: 1 header (or a
+# random PROFILE_SAMPLE_RATE share of them) are profiled and the result
+# saved to PROFILE_DIR; fetch them from /admin/profiles.
+PROFILING_ENABLED = env_bool("PROFILING_ENABLED", False)
+PROFILE_SAMPLE_RATE = env_float("PROFILE_SAMPLE_RATE", 0.0)
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "backend_svc_profiles"))
+PROFILE_INTERVAL_MS = env_float("PROFILE_INTERVAL_MS", 5.0)
+PROFILE_KEEP = env_int("PROFILE_KEEP", 50)
+# Required in the X-Admin-Token header of admin endpoints (and to trigger
+# profiling by header) when set.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Background cache warming: count searchxng queries (weather lookups
+# included) and, every CACHE_WARM_INTERVAL seconds, re-run the most
+# popular ones at no more than CACHE_WARM_RATE searches per second so
+# their cached results are fresh before users ask again.
+CACHE_WARM_ENABLED = env_bool("CACHE_WARM_ENABLED", False)
+CACHE_WARM_INTERVAL = env_float("CACHE_WARM_INTERVAL", 120.0)
+CACHE_WARM_TOP_K = env_int("CACHE_WARM_TOP_K", 20)
+CACHE_WARM_MIN_COUNT = env_float("CACHE_WARM_MIN_COUNT", 3.0)
+CACHE_WARM_RATE = env_float("CACHE_WARM_RATE", 0.5)
+# Popularity halves over this many seconds so old favourites fade out.
+CACHE_WARM_HALF_LIFE = env_float("CACHE_WARM_HALF_LIFE", 12 * 3600.0)
+
+# Routing micro-batching: first-turn routing requests arriving within
+# ROUTING_BATCH_WINDOW_MS of each other (up to ROUTING_BATCH_MAX_SIZE) are
+# decided by one structured-output call; queries it cannot decide fall
+# back to their own routing call.
+ROUTING_BATCH_ENABLED = env_bool("ROUTING_BATCH_ENABLED", False)
+ROUTING_BATCH_WINDOW_MS = env_float("ROUTING_BATCH_WINDOW_MS", 25.0)
+ROUTING_BATCH_MAX_SIZE = env_int("ROUTING_BATCH_MAX_SIZE", 8)
+
+# Session-aware inference: requests carrying a session_id extend the exact
+# message list sent on the session's previous turn (static system prompt,
+# tool calls and results kept), so Ollama can reuse that prefix from its
+# KV cache and only prefill the new messages. Sessions are pinned to one
+# of OLLAMA_URLS. Transcripts longer than SESSION_MAX_CHARS are rebuilt
+# from the history to stay inside num_ctx.
+SESSION_REUSE_ENABLED = env_bool("SESSION_REUSE_ENABLED", False)
+SESSION_STORE_SIZE = env_int("SESSION_STORE_SIZE", 1024)
+SESSION_TTL = env_float("SESSION_TTL", 1800.0)
+SESSION_MAX_CHARS = env_int("SESSION_MAX_CHARS", 12000)
+
+# Answer single weather questions from the extracted fields (temperature,
+# conditions, ...) with a fixed template instead of another LLM call.
+WEATHER_TEMPLATE_ANSWERS = env_bool("WEATHER_TEMPLATE_ANSWERS", False)
+
+# Tool subsetting: score each tool's relevance to the message by keyword
+# and send only the likely ones (schemas and routing rules) to the model,
+# at most TOOL_SUBSET_MAX. searchxng is always offered as the catch-all.
+# Not applied to session transcripts, whose system prompt must not change.
+TOOL_SUBSET_ENABLED = env_bool("TOOL_SUBSET_ENABLED", False)
+TOOL_SUBSET_MAX = env_int("TOOL_SUBSET_MAX", 2)
+
+# Stop the upstream work of abandoned requests: when the client disconnects,
+# or sends a newer message with the same session_id, its Ollama streams and
+# SearXNG reads are closed at the next chunk and no further step is started.
+# /chat checks for a disconnect every DISCONNECT_POLL_SECONDS.
+CANCEL_ABANDONED_REQUESTS = env_bool("CANCEL_ABANDONED_REQUESTS", True)
+DISCONNECT_POLL_SECONDS = env_float("DISCONNECT_POLL_SECONDS", 0.5)
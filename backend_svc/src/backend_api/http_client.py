@@ -0,0 +1,12 @@
+# src/backend_api/http_client.py
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.backend_api.config import HTTP_POOL_SIZE
+
+# One pooled session shared by the Ollama client and the tools, so
+# connections opened during warm-up are reused by real requests.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
@@ -0,0 +1,33 @@
+# src/backend_api/metrics.py
+import threading
+from collections import defaultdict
+from typing import Callable, Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_derived: Dict[str, Callable[[Dict[str, float]], float]] = {}
+
+
+def incr(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] += value
+
+
+def register_ratio(name: str, numerator: str, denominator: str) -> None:
+    """
+    Expose `numerator / denominator` (0 when nothing was counted yet)
+    alongside the raw counters.
+    """
+    def compute(counters: Dict[str, float]) -> float:
+        total = counters.get(denominator, 0)
+        return counters.get(numerator, 0) / total if total else 0.0
+
+    _derived[name] = compute
+
+
+def snapshot() -> Dict[str, float]:
+    with _lock:
+        counters = dict(_counters)
+    for name, compute in _derived.items():
+        counters[name] = compute(counters)
+    return counters
@@ -1,16 +1,138 @@
-import requests
+import hashlib
+import json
+import logging
+import os
+import time
+from urllib.parse import urljoin
 
-OLLAMA_URL = "http://host.docker.internal:11434/api/chat"
-OLLAMA_MODEL = "granite4:350m"
+from src.backend_api import metrics
+from src.backend_api.budget import call_timeout, check_deadline
+from src.backend_api.cancellation import RequestCancelled, check_cancelled
+from src.backend_api.config import OLLAMA_EMBED_MODEL
+from src.backend_api.http_client import SESSION
+from src.backend_api.profiles import PROFILES, profile_fields
+from src.backend_api.sessions import current_session
+from src.backend_api.trace import ollama_timings, record
 
-def call_ollama(messages: list, tools: list = None, stream: bool = False):
+logger = logging.getLogger("ollama_client")
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://host.docker.internal:11434/api/chat")
+OLLAMA_EMBED_URL = os.getenv("OLLAMA_EMBED_URL", urljoin(OLLAMA_URL, "/api/embed"))
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "granite4:350m")
+# Chat endpoints serving the same model; each session sticks to one of them
+OLLAMA_URLS = [u.strip() for u in os.getenv("OLLAMA_URLS", "").split(",") if u.strip()] or [OLLAMA_URL]
+
+for _profile in PROFILES:
+    metrics.register_ratio(f"ollama.{_profile}.prompt_tokens_per_second",
+                           f"ollama.{_profile}.prompt_tokens", f"ollama.{_profile}.prompt_seconds")
+    metrics.register_ratio(f"ollama.{_profile}.eval_tokens_per_second",
+                           f"ollama.{_profile}.eval_tokens", f"ollama.{_profile}.eval_seconds")
+
+
+def count_timings(profile: str, timings: dict) -> None:
+    """
+    Add one call's token counts and prefill/decode/load time to the
+    per-profile throughput metrics.
+    """
+    metrics.incr(f"ollama.{profile}.calls")
+    metrics.incr(f"ollama.{profile}.prompt_tokens", timings.get("prompt_eval_count", 0))
+    metrics.incr(f"ollama.{profile}.prompt_seconds", timings.get("prompt_eval_duration", 0) / 1e9)
+    metrics.incr(f"ollama.{profile}.eval_tokens", timings.get("eval_count", 0))
+    metrics.incr(f"ollama.{profile}.eval_seconds", timings.get("eval_duration", 0) / 1e9)
+    metrics.incr(f"ollama.{profile}.load_seconds", timings.get("load_duration", 0) / 1e9)
+
+
+def count_truncation(profile: str, response: dict) -> bool:
+    """
+    Count a generation cut off by the profile's num_predict.
+    """
+    if response.get("done_reason") != "length":
+        return False
+    metrics.incr(f"ollama.{profile}.truncated")
+    return True
+
+
+def chat_url() -> str:
+    """
+    Endpoint for the current session, chosen by rendezvous hashing so a
+    session keeps hitting the server that holds its context in cache.
+    """
+    session_id = current_session.get()
+    if session_id is None or len(OLLAMA_URLS) == 1:
+        return OLLAMA_URLS[0]
+    return max(OLLAMA_URLS, key=lambda url: hashlib.sha1(f"{session_id}|{url}".encode()).digest())
+
+
+def call_ollama(messages: list, tools: list = None, stream: bool = False, profile: str = "answer"):
     payload = {
         "model": OLLAMA_MODEL,
         "messages": messages,
-        "stream": stream
+        "stream": stream,
+        **profile_fields(profile)
     }
     if tools:
         payload["tools"] = tools
-    resp = requests.post(OLLAMA_URL, json=payload, timeout=500)
+    # A blocking call cannot be stopped halfway, so check before sending it
+    check_cancelled()
+    started = time.monotonic()
+    resp = SESSION.post(chat_url(), json=payload, timeout=call_timeout(500))
+    resp.raise_for_status()
+    data = resp.json()
+    timings = ollama_timings(data)
+    count_timings(profile, timings)
+    # The pipeline regenerates direct answers cut short by the route profile
+    count_truncation(profile, data)
+    record("llm", time.monotonic() - started, tools=bool(tools), profile=profile, **timings)
+    return data
+
+
+def stream_ollama(messages: list, tools: list = None, profile: str = "answer"):
+    """
+    Yield the assistant's content as Ollama generates it.
+    Closing the generator (or running past the request deadline, or the
+    request being cancelled) closes the connection, which stops generation.
+    """
+    payload = {
+        "model": OLLAMA_MODEL,
+        "messages": messages,
+        "stream": True,
+        **profile_fields(profile)
+    }
+    if tools:
+        payload["tools"] = tools
+    check_cancelled()
+    started = time.monotonic()
+    with SESSION.post(chat_url(), json=payload, stream=True, timeout=call_timeout(500)) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            # The read timeout only bounds the gap between chunks
+            check_deadline()
+            try:
+                check_cancelled()
+            except RequestCancelled:
+                metrics.incr(f"ollama.{profile}.streams_cancelled")
+                raise
+            chunk = json.loads(line)
+            content = chunk.get("message", {}).get("content", "")
+            if content:
+                yield content
+            if chunk.get("done"):
+                timings = ollama_timings(chunk)
+                count_timings(profile, timings)
+                if count_truncation(profile, chunk):
+                    limit = PROFILES.get(profile, {}).get("options", {}).get("num_predict")
+                    logger.warning(f"'{profile}' answer cut off at num_predict={limit} tokens")
+                record("llm", time.monotonic() - started, tools=bool(tools), profile=profile, **timings)
+                break
+
+
+def embed(texts: list) -> list:
+    """
+    One embedding vector per input text, from Ollama's /api/embed.
+    """
+    payload = {"model": OLLAMA_EMBED_MODEL, "input": texts}
+    resp = SESSION.post(OLLAMA_EMBED_URL, json=payload, timeout=call_timeout(60))
     resp.raise_for_status()
-    return resp.json()
+    return resp.json()["embeddings"]
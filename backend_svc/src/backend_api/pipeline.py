@@ -0,0 +1,353 @@
+# src/backend_api/pipeline.py
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+from src.backend_api import metrics
+from src.backend_api.budget import DeadlineExceeded, LatencyBudget, current_budget, estimator
+from src.backend_api.cancellation import CancelToken, RequestCancelled, check_cancelled
+from src.backend_api.config import (
+    AGENT_MAX_STEPS,
+    ROUTE_CACHE_ENABLED,
+    ROUTING_BATCH_ENABLED,
+    SEMANTIC_CACHE_ENABLED,
+    SESSION_REUSE_ENABLED,
+    SPECULATIVE_SEARCH,
+    TOOL_SUBSET_ENABLED,
+    TOOL_SUBSET_MAX,
+    WEATHER_TEMPLATE_ANSWERS,
+)
+from src.backend_api.ollama_client import call_ollama, stream_ollama
+from src.backend_api.prompts import (
+    build_followup_system_prompt,
+    build_initial_system_prompt,
+    build_routing_messages,
+)
+from src.backend_api.route_batcher import route_batcher
+from src.backend_api.route_cache import cached_decision, remember_decision
+from src.backend_api.routing import decision_from_response
+from src.backend_api.schemas import ChatRequest
+from src.backend_api.semantic_cache import answer_cache
+from src.backend_api.sessions import current_session, sessions
+from src.backend_api.speculative import SpeculativeSearch
+from src.backend_api.tool_selection import count_prompt_size, select_tools
+from src.backend_api.tools import TOOLS, dispatch_tool
+from src.backend_api.tools.weather_extract import render_weather_answer
+from src.backend_api.trace import current_trace, enter_phase, record
+from src.backend_api.utils import summarize_tool_results
+
+logger = logging.getLogger("backend_api")
+
+_EXHAUSTED = object()
+
+
+async def iterate_in_thread(iterator: Iterator[str]) -> AsyncIterator[str]:
+    """
+    Drain a blocking iterator (e.g. a streaming HTTP response) from a
+    worker thread, one item at a time, without blocking the event loop.
+    """
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close:
+            try:
+                close()
+            except ValueError:
+                # Still running in the worker thread; it finishes on its own
+                pass
+
+
+async def within_deadline(stream: AsyncIterator[str], budget: LatencyBudget,
+                          token: Optional[CancelToken] = None) -> AsyncIterator[str]:
+    """
+    Pass chunks through until the budget runs out or `token` is
+    cancelled, then cancel whatever the pipeline is waiting on and raise
+    DeadlineExceeded or RequestCancelled.
+    """
+    cancelled = token.wait() if token is not None else None
+    try:
+        while True:
+            next_chunk = asyncio.ensure_future(stream.__anext__())
+            try:
+                waiting = {next_chunk} if cancelled is None else {next_chunk, cancelled}
+                await asyncio.wait(waiting, timeout=budget.remaining(), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                if not next_chunk.done():
+                    next_chunk.cancel()
+                    # Let the pipeline unwind before the stream is closed
+                    await asyncio.wait({next_chunk})
+            if token is not None and token.cancelled:
+                raise RequestCancelled(token.reason)
+            if next_chunk.cancelled():
+                raise DeadlineExceeded(budget.seconds)
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                return
+            yield chunk
+    finally:
+        await stream.aclose()
+
+
+def bind_request(request: ChatRequest, budget: LatencyBudget) -> None:
+    """
+    Make `budget` and the request's session current. Call it in the task
+    that drives stream_answer, before creating it: within_deadline runs
+    every step of the generator in a new task with a copy of that
+    context, so values set inside the generator would not last past the
+    first chunk.
+    """
+    current_budget.set(budget)
+    current_session.set(request.session_id)
+
+
+async def stream_answer(request: ChatRequest, budget: LatencyBudget) -> AsyncIterator[str]:
+    """
+    Yield the final answer as it is generated, serving standalone
+    questions from the semantic answer cache when a near-duplicate was
+    answered recently. Every outbound call is bounded by `budget`
+    (bound with bind_request).
+    """
+    # Follow-up turns depend on the conversation, so only standalone questions are cached
+    vector = None
+    if SEMANTIC_CACHE_ENABLED and not request.history:
+        try:
+            vector = await asyncio.to_thread(answer_cache.embed, request.message)
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping semantic cache: {e}")
+        if vector is not None:
+            cached = answer_cache.lookup(vector)
+            if cached is not None:
+                _record_response(cached)
+                yield cached
+                return
+
+    used_tools = []
+    chunks = []
+    async for chunk in run_tools(request, budget, used_tools):
+        chunks.append(chunk)
+        yield chunk
+
+    answer = "".join(chunks)
+    _record_response(answer)
+
+    # Dates go stale at midnight whatever the TTL says
+    if vector is not None and "get_date" not in used_tools:
+        answer_cache.store(vector, request.message, answer)
+
+
+def _record_response(answer: str) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.response = answer
+
+
+async def run_tools(request: ChatRequest, budget: LatencyBudget, used_tools: list) -> AsyncIterator[str]:
+    """
+    Let the model chain up to AGENT_MAX_STEPS tool calls, as long as the
+    request's latency budget leaves room for another round plus the final
+    answer, then yield the final answer as it is generated. Names of the
+    tools run are appended to `used_tools`.
+    """
+    logger.debug(f"Received message: {request.message}")
+    logger.debug(f"Chat history: {request.history}")
+
+    # In session mode, extend exactly what the previous turn sent so the
+    # model server can reuse it from its KV cache
+    session_id = request.session_id if SESSION_REUSE_ENABLED else None
+    messages = sessions.transcript(session_id, request.history) if session_id else None
+    # Offer only the tools the message plausibly needs (not in session
+    # mode: the cached system prompt must stay the same)
+    tool_names = None
+    if TOOL_SUBSET_ENABLED and not session_id:
+        tool_names = select_tools(request.message, request.history, TOOL_SUBSET_MAX)
+    routing_tools = [t for t in TOOLS if tool_names is None or t["function"]["name"] in tool_names]
+    if messages is not None:
+        messages.append({"role": "user", "content": request.message})
+    else:
+        # System prompt, past LLM answers (not tool outputs!) and the new message
+        messages = build_routing_messages(request.message, request.history, max_tool_calls=AGENT_MAX_STEPS,
+                                          static_system=bool(session_id), tools=tool_names)
+    logger.debug(f"initial_messages: {messages}")
+
+    # Most traffic ends up in searchxng: start it now so it overlaps the routing call.
+    # Not for follow-ups: their raw text ("and tomorrow?") is a poor query, and
+    # it would count towards the popularity that drives cache warming
+    speculative = SpeculativeSearch(request.message) if SPECULATIVE_SEARCH and not request.history else None
+
+    # (tool_call_id, tool_name, tool_args, tool_output) for every tool run
+    tool_results = []
+
+    try:
+        for step in range(AGENT_MAX_STEPS):
+            # Nothing new is started for a client that is gone
+            check_cancelled()
+            # The first round always runs; later ones only if they still
+            # leave time for the final answer
+            round_cost = estimator.expected("route") + estimator.expected("tool") + estimator.expected("answer")
+            if step > 0 and not budget.fits(round_cost):
+                logger.debug(f"Budget stop after {step} steps: {budget.remaining():.1f}s left, round needs ~{round_cost:.1f}s")
+                metrics.incr("agent.budget_stops")
+                break
+
+            # ---- Routing call: pick a tool or answer ----
+            enter_phase("route")
+            started = time.monotonic()
+            decision = None
+            if step == 0 and ROUTE_CACHE_ENABLED:
+                # Repeated questions reuse the tool choice made last time
+                decision = await asyncio.to_thread(cached_decision, request.message, request.history)
+            cache_hit = decision is not None
+            if decision is None and step == 0 and ROUTING_BATCH_ENABLED and not request.history:
+                decision = await route_batcher.route(request.message)
+            if decision is not None:
+                resp = {"message": decision.as_message()}
+            else:
+                if step == 0:
+                    # Only prompts actually sent count (not cache or batch hits)
+                    _count_routing_prompt(request, messages, routing_tools, subset=tool_names is not None)
+                resp = await asyncio.to_thread(call_ollama, messages, tools=routing_tools, profile="route")
+            if not cache_hit:
+                estimator.observe("route", time.monotonic() - started)
+                if step == 0 and ROUTE_CACHE_ENABLED:
+                    await asyncio.to_thread(remember_decision, request.message, request.history,
+                                            decision or decision_from_response(resp))
+            metrics.incr("agent.steps")
+            logger.debug(f"step {step} resp: {resp}")
+
+            if decision is not None and decision.tool is None:
+                # The batch only decided; the answer still has to be written
+                async for chunk in stream_direct_answer(messages):
+                    yield chunk
+                return
+
+            assistant_msg = resp.get("message", {})
+            tool_calls = assistant_msg.get("tool_calls", [])
+
+            if not tool_calls:
+                if tool_results:
+                    # No further tool wanted: the answer prompt writes the
+                    # reply from the results, streamed (the routing reply is
+                    # a short, blocking draft)
+                    metrics.incr("agent.done_after_tools")
+                    break
+                if resp.get("done_reason") == "length":
+                    # The route profile's num_predict cut a direct answer short
+                    metrics.incr("agent.truncated_direct_answers")
+                    async for chunk in stream_direct_answer(messages):
+                        yield chunk
+                    return
+                yield assistant_msg.get("content", "")
+                return
+
+            tool_call = tool_calls[0]  # One tool per round
+            tool_name = tool_call["function"]["name"]
+            tool_args = tool_call["function"].get("arguments", {})
+            tool_call_id = tool_call.get("id", f"call_{step}")
+            used_tools.append(tool_name)
+
+            # ---- Run the tool ----
+            check_cancelled()
+            enter_phase("tool")
+            started = time.monotonic()
+            tool_output = None
+            if speculative and step == 0:
+                tool_output = await speculative.claim(tool_name, tool_args)
+            if tool_output is None:
+                tool_output = await asyncio.to_thread(dispatch_tool, tool_name, tool_args)
+            estimator.observe("tool", time.monotonic() - started)
+            record("tool", time.monotonic() - started, name=tool_name, args=tool_args)
+            logger.debug(f"Tool result: {tool_name} {tool_args} -> {tool_output}")
+
+            tool_results.append((tool_call_id, tool_name, tool_args, tool_output))
+            messages.append(assistant_msg)
+            messages.append({"role": "tool", "tool_call_id": tool_call_id, "content": json.dumps(tool_output)})
+
+            if WEATHER_TEMPLATE_ANSWERS and step == 0 and tool_name == "get_weather":
+                # A plain weather question needs no model to phrase the answer
+                answer = render_weather_answer(tool_output) if isinstance(tool_output, dict) else None
+                if answer:
+                    metrics.incr("weather.template_answers")
+                    yield answer
+                    return
+        else:
+            metrics.incr("agent.step_limit_stops")
+
+        # ---- Final answer from the tool results gathered so far ----
+        if session_id:
+            # Continue the same conversation instead of a fresh follow-up prompt
+            final_answer = stream_direct_answer(messages)
+        else:
+            final_answer = stream_final_answer(request, tool_results)
+        async for chunk in final_answer:
+            yield chunk
+
+    finally:
+        if speculative:
+            speculative.discard()
+        if session_id:
+            sessions.save(session_id, messages, request.history, request.message)
+
+
+def _count_routing_prompt(request: ChatRequest, messages: list, routing_tools: list, subset: bool) -> None:
+    sent = len(messages[0]["content"]) + len(json.dumps(routing_tools))
+    full = sent
+    if subset:
+        full = len(build_initial_system_prompt(request.message, AGENT_MAX_STEPS)) + len(json.dumps(TOOLS))
+    count_prompt_size(sent, full, len(routing_tools))
+
+
+async def stream_direct_answer(messages: list) -> AsyncIterator[str]:
+    """
+    Answer the conversation without tools, using the answer profile.
+    """
+    enter_phase("answer")
+    started = time.monotonic()
+    async for chunk in iterate_in_thread(stream_ollama(messages, profile="answer")):
+        yield chunk
+    estimator.observe("answer", time.monotonic() - started)
+
+
+async def stream_final_answer(request: ChatRequest, tool_results: list) -> AsyncIterator[str]:
+    # Summarize for the follow-up pass
+    if len(tool_results) == 1:
+        summarized_tool_text = summarize_tool_results(tool_results[0][3], request.message)
+    else:
+        summarized_tool_text = "\n\n".join(
+            f"[{tool_name} {json.dumps(tool_args)}]\n{summarize_tool_results(tool_output, request.message)}"
+            for _, tool_name, tool_args, tool_output in tool_results
+        )
+
+    past_llm_history = "\n".join([f"User: {u}\nAssistant: {a}" for u, a in request.history])
+
+    followup_prompt = build_followup_system_prompt(
+        latest_user_message=request.message,
+        summarized_tool_results=summarized_tool_text,
+        chat_history=past_llm_history
+    )
+
+    followup_messages = [
+        {"role": "system", "content": followup_prompt},
+        {"role": "user", "content": request.message},
+    ]
+    for tool_call_id, _, _, tool_output in tool_results:
+        followup_messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call_id,
+            "content": json.dumps(tool_output)
+        })
+
+    logger.debug(f"followup_messages: {followup_messages}")
+
+    enter_phase("answer")
+    started = time.monotonic()
+    async for chunk in iterate_in_thread(stream_ollama(followup_messages, profile="answer")):
+        yield chunk
+    estimator.observe("answer", time.monotonic() - started)
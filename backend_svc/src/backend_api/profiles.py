@@ -0,0 +1,73 @@
+# src/backend_api/profiles.py
+import json
+import logging
+import os
+
+from src.backend_api.config import OLLAMA_KEEP_ALIVE, OLLAMA_PROFILES
+from src.backend_api.routing import BATCH_DECISIONS_SCHEMA
+
+logger = logging.getLogger("profiles")
+
+# Named generation settings per kind of Ollama call. "route" only has to
+# emit a tool decision, so it decodes little and needs a small context;
+# "answer" writes the final reply; "route_batch" returns JSON decisions
+# for several queries at once (ROUTING_BATCH_ENABLED). Any key besides
+# "options" is sent as a top-level request field (keep_alive, format, model).
+# Profiles sharing a model should share num_ctx: Ollama reloads a model
+# whenever the requested context size changes.
+# "route" deliberately has no "format": Ollama applies a format constraint
+# to the message content, which keeps the model from emitting the native
+# tool_calls the router reads. JSON-constrained routing is what
+# "route_batch" does, where no tools are offered.
+DEFAULT_PROFILES = {
+    "route": {
+        "options": {"num_predict": 128, "num_ctx": 4096, "temperature": 0},
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+    },
+    "answer": {
+        "options": {"num_predict": 512, "num_ctx": 4096},
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+    },
+    "route_batch": {
+        "options": {"num_predict": 512, "num_ctx": 4096, "temperature": 0},
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "format": BATCH_DECISIONS_SCHEMA,
+    },
+}
+
+
+def load_profiles(override: str) -> dict:
+    """
+    Defaults merged with `override` (a JSON object or the path of a JSON
+    file); options are merged key by key.
+    """
+    profiles = {name: {**p, "options": dict(p.get("options", {}))} for name, p in DEFAULT_PROFILES.items()}
+    if not override:
+        return profiles
+
+    if os.path.isfile(override):
+        with open(override) as f:
+            custom = json.load(f)
+    else:
+        custom = json.loads(override)
+
+    for name, settings in custom.items():
+        profile = profiles.setdefault(name, {"options": {}})
+        profile["options"].update(settings.get("options", {}))
+        profile.update({k: v for k, v in settings.items() if k != "options"})
+    logger.info(f"Ollama call profiles: {profiles}")
+    return profiles
+
+
+PROFILES = load_profiles(OLLAMA_PROFILES)
+
+
+def profile_fields(name: str) -> dict:
+    """
+    Request fields for the named profile (unknown names add nothing).
+    """
+    profile = PROFILES.get(name, {})
+    fields = {k: v for k, v in profile.items() if k != "options"}
+    if profile.get("options"):
+        fields["options"] = dict(profile["options"])
+    return fields
@@ -0,0 +1,216 @@
+# src/backend_api/profiling.py
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import List, Optional
+
+from src.backend_api import metrics
+from src.backend_api.config import (
+    ADMIN_TOKEN,
+    PROFILE_DIR,
+    PROFILE_INTERVAL_MS,
+    PROFILE_KEEP,
+    PROFILE_SAMPLE_RATE,
+)
+
+logger = logging.getLogger("profiling")
+
+PROFILED_PATHS = ("/chat", "/chat/stream")
+PROFILE_KINDS = {"collapsed": "text/plain", "prof": "application/octet-stream", "json": "application/json"}
+
+# Only one deterministic profiler can be active per process
+_cprofile_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples the stacks of every thread at a fixed interval and counts
+    them in collapsed form ("thread;outer;...;inner"), the input format
+    of flamegraph tools. Covers the event loop and the worker threads the
+    request uses, but also anything else running at the same time.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    """
+    Sampling profile of all threads plus, when no other profile is
+    running, a cProfile of the event loop thread.
+    """
+
+    def __init__(self):
+        self.id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+        self.started = time.monotonic()
+        self.sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+        self.cprofile: Optional[cProfile.Profile] = None
+
+    def start(self) -> None:
+        self.sampler.start()
+        if _cprofile_lock.acquire(blocking=False):
+            self.cprofile = cProfile.Profile()
+            try:
+                self.cprofile.enable()
+            except ValueError:
+                # Another profiler (debugger, coverage) is active
+                self.cprofile = None
+                _cprofile_lock.release()
+
+    def stop(self) -> None:
+        self.sampler.stop()
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            _cprofile_lock.release()
+
+    def save(self, path: str, status) -> None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, self.id)
+        with open(base + ".collapsed", "w") as f:
+            f.write(self.sampler.collapsed())
+
+        summary = {
+            "id": self.id,
+            "path": path,
+            "status": status,
+            "created": time.time(),
+            "seconds": round(time.monotonic() - self.started, 4),
+            "samples": self.sampler.samples,
+            "interval_ms": PROFILE_INTERVAL_MS,
+        }
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(base + ".prof")
+            out = io.StringIO()
+            pstats.Stats(self.cprofile, stream=out).sort_stats("cumulative").print_stats(25)
+            summary["top_cumulative"] = out.getvalue()
+        with open(base + ".json", "w") as f:
+            json.dump(summary, f, indent=2)
+        _prune(PROFILE_KEEP)
+
+
+def _prune(keep: int) -> None:
+    for profile in list_profiles()[keep:]:
+        for kind in PROFILE_KINDS:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, f"{profile['id']}.{kind}"))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[dict]:
+    """
+    Saved profile summaries, newest first.
+    """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(PROFILE_DIR, name)) as f:
+                    summary = json.load(f)
+            except (OSError, ValueError):
+                continue
+            summary.pop("top_cumulative", None)
+            profiles.append(summary)
+    return sorted(profiles, key=lambda p: p["created"], reverse=True)
+
+
+def profile_file(profile_id: str, kind: str) -> Optional[str]:
+    if kind not in PROFILE_KINDS or not profile_id.replace("-", "").isalnum():
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.{kind}")
+    return path if os.path.isfile(path) else None
+
+
+class RequestProfiler:
+    """
+    ASGI middleware profiling chat requests that ask for it with
+    `X-Profile: 1` plus the X-Admin-Token (only when ADMIN_TOKEN is set)
+    or fall in the PROFILE_SAMPLE_RATE sample. The profile id is returned in the
+    X-Profile-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def wanted(self, scope) -> bool:
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        if headers.get("x-profile") == "1":
+            # Never on the header alone: without ADMIN_TOKEN anyone could start one
+            return bool(ADMIN_TOKEN) and headers.get("x-admin-token") == ADMIN_TOKEN
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in PROFILED_PATHS or not self.wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        status = {}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.id.encode("latin-1"))]}
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.stop()
+            metrics.incr("profiling.profiles")
+            try:
+                # Writing the dumps would block every request on the event loop
+                await asyncio.to_thread(profile.save, scope["path"], status.get("code"))
+                logger.info(f"Saved profile {profile.id} for {scope['path']}")
+            except OSError as e:
+                logger.warning(f"Could not save profile {profile.id}: {e}")
@@ -1,44 +1,76 @@
 # src/backend_api/prompts.py
+from typing import List, Optional
 
-def build_initial_system_prompt(user_query: str) -> str:
-    """
-    LLM sees only user_query + instructions to pick ONE tool if needed.
-    No previous tool results.
-    """
-    return f"""
-You are an AI assistant with access to 3 tools:
 
-1. get_weather
-2. get_date
-3. searchxng
+# Order in which tools are listed to the model
+TOOL_ORDER = ["get_weather", "get_date", "searchxng"]
 
-TOOL ROUTING RULES (VERY IMPORTANT):
-
-• Use **searchxng** for ANY question about:
+# Routing rules per tool, in prompt order; only the sections of the tools
+# offered to the model are included.
+TOOL_RULES = {
+    "searchxng": """• Use **searchxng** for ANY question about:
   - current facts
   - people (e.g., prime minister, president, CEO)
   - news, events
   - political leaders
   - places
   - general knowledge requiring external facts
-
-• Use **get_weather** ONLY if the user asks about the weather.
-
-• Use **get_date** ONLY if the user explicitly asks:
+""",
+    "get_weather": """• Use **get_weather** ONLY if the user asks about the weather.
+""",
+    "get_date": """• Use **get_date** ONLY if the user explicitly asks:
   - "what is the date?"
   - "what is today's date?"
   - "what day is it?"
   - "what is the current date?"
 
 If the user does NOT explicitly ask about the date, you MUST NOT call get_date.
+""",
+}
+
+# Extra lines for the IMPORTANT section, per tool
+TOOL_WARNINGS = {
+    "get_date": "- Never choose get_date for questions about people or political leaders.\n",
+}
+
+
+def build_initial_system_prompt(user_query: Optional[str], max_tool_calls: int = 1,
+                                tools: Optional[List[str]] = None) -> str:
+    """
+    LLM sees only user_query + instructions to pick ONE tool if needed.
+    No previous tool results. With max_tool_calls > 1 the model may chain
+    tools, one per turn, after seeing each result. Without user_query the
+    prompt is the same for every turn, so it can stay cached as a prefix.
+    `tools` restricts the prompt to those tools (default: all).
+    """
+    offered = [name for name in TOOL_ORDER if tools is None or name in tools]
+    query_line = f"User query: '{user_query}'\n" if user_query is not None else ""
+    if max_tool_calls > 1:
+        tool_limit = (f"- Call **one tool at a time**. After you see its result you may call another tool\n"
+                      f"  if the question needs more information (at most {max_tool_calls} tools in total).")
+        decision = "Decide whether to call a tool or answer directly."
+    else:
+        tool_limit = "- You may call **at most one tool**."
+        decision = "Decide whether to call exactly one tool or answer directly."
+
+    tool_list = "\n".join(f"{i}. {name}" for i, name in enumerate(offered, start=1))
+    rules = "\n".join(rule for name, rule in TOOL_RULES.items() if name in offered)
+    warnings = "".join(TOOL_WARNINGS.get(name, "") for name in offered)
+    plural = "tool" if len(offered) == 1 else "tools"
 
+    return f"""
+You are an AI assistant with access to {len(offered)} {plural}:
+
+{tool_list}
+
+TOOL ROUTING RULES (VERY IMPORTANT):
+
+{rules}
 IMPORTANT:
-- You may call **at most one tool**.
+{tool_limit}
 - If no tool is needed, answer directly.
-- Never choose get_date for questions about people or political leaders.
-
-User query: '{user_query}'
-Decide whether to call exactly one tool or answer directly.
+{warnings}
+{query_line}{decision}
 """
 
 
@@ -72,3 +104,45 @@ CRITICAL INSTRUCTIONS:
 Your output MUST be the final answer to the question, nothing else.
 """
 
+
+def build_routing_messages(user_query: str, history=(), max_tool_calls: int = 1, static_system: bool = False,
+                           tools: Optional[List[str]] = None) -> list:
+    """
+    Messages for the first routing call: the tool-calling system prompt,
+    past turns (LLM responses only, never tool outputs) and the new query.
+    `static_system` leaves the query out of the system prompt; `tools`
+    limits it to those tools' rules.
+    """
+    system_prompt = build_initial_system_prompt(None if static_system else user_query,
+                                                max_tool_calls=max_tool_calls, tools=tools)
+    messages = [{"role": "system", "content": system_prompt}]
+    for user_msg, assistant_msg in history:
+        messages.append({"role": "user", "content": user_msg})
+        messages.append({"role": "assistant", "content": assistant_msg})
+    messages.append({"role": "user", "content": user_query})
+    return messages
+
+
+def build_batch_routing_prompt() -> str:
+    """
+    Routing rules for several independent queries answered in one JSON
+    reply. Static, so every batch shares the same prompt prefix.
+    """
+    return """
+You route user queries to tools. You will receive a JSON object with a list of
+queries, each with an "id". The queries come from different users and are
+unrelated to each other.
+
+Tools:
+- get_weather: current weather for a location. Needs "location".
+- get_date: today's date. Only if the user explicitly asks for the date or the day.
+- searchxng: web search for current facts, people, news, events, political
+  leaders, places and general knowledge requiring external facts. Needs "query".
+- none: no tool needed, the question can be answered directly.
+
+Never choose get_date for questions about people or political leaders.
+
+Return JSON with one entry per query in "decisions":
+{"id": <query id>, "tool": "<tool name or none>", "location": "...", "query": "..."}
+Include "location" only for get_weather and "query" only for searchxng.
+"""
@@ -0,0 +1,104 @@
+# src/backend_api/recorder.py
+import json
+import logging
+import re
+import threading
+import time
+
+from src.backend_api.config import RECORD_MAX_RESPONSE_CHARS
+from src.backend_api.trace import RequestTrace, current_trace
+
+logger = logging.getLogger("recorder")
+
+RECORDED_PATHS = ("/chat", "/chat/stream")
+
+_REDACTIONS = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}\b"), "<ip>"),
+    (re.compile(r"\+?\d[\d ()-]{7,}\d"), "<phone>"),
+    (re.compile(r"\b\d{5,}\b"), "<number>"),
+]
+
+
+def anonymize(text: str) -> str:
+    """
+    Strip things that identify a person (emails, phone numbers, IPs, URLs,
+    long numbers) while keeping the wording that drives routing.
+    """
+    for pattern, placeholder in _REDACTIONS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+def anonymize_event(event: dict) -> dict:
+    """
+    A trace event with the string values of its tool arguments anonymized
+    (the model's search query often repeats the message).
+    """
+    if not isinstance(event.get("args"), dict):
+        return event
+    args = {k: anonymize(v) if isinstance(v, str) else v for k, v in event["args"].items()}
+    return {**event, "args": args}
+
+
+class TrafficRecorder:
+    """
+    ASGI middleware appending one compact JSON line per chat request:
+    the anonymized ChatRequest, the trace of upstream calls and tool
+    decisions, status, total latency and the anonymized answer.
+    """
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+        self.lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in RECORDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        status = {}
+        trace = RequestTrace()
+        token = current_trace.set(trace)
+        started_at = time.time()
+
+        async def receive_and_capture():
+            message = await receive()
+            if message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+            return message
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_capture, send_and_capture)
+        finally:
+            current_trace.reset(token)
+            self.write(scope["path"], bytes(body), status.get("code"), started_at, trace)
+
+    def write(self, path: str, body: bytes, status_code, started_at: float, trace: RequestTrace) -> None:
+        try:
+            request = json.loads(body or b"{}")
+            line = {
+                "ts": round(started_at, 3),
+                "ep": path,
+                "msg": anonymize(request.get("message", "")),
+                "hist": [[anonymize(u), anonymize(a)] for u, a in request.get("history", [])],
+                "st": status_code,
+                "lat": round(time.monotonic() - trace.started, 4),
+                "ev": [anonymize_event(e) for e in trace.events],
+                "resp": anonymize((trace.response or "")[:RECORD_MAX_RESPONSE_CHARS]),
+            }
+            if request.get("timeout_seconds"):
+                line["to"] = request["timeout_seconds"]
+            encoded = json.dumps(line, separators=(",", ":")) + "\n"
+            with self.lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(encoded)
+        except Exception as e:
+            logger.warning(f"Could not record request: {e}")
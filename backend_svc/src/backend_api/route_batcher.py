@@ -0,0 +1,98 @@
+# src/backend_api/route_batcher.py
+import asyncio
+import json
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from src.backend_api import metrics
+from src.backend_api.budget import current_budget
+from src.backend_api.cancellation import current_cancel
+from src.backend_api.config import ROUTING_BATCH_MAX_SIZE, ROUTING_BATCH_WINDOW_MS
+from src.backend_api.ollama_client import call_ollama
+from src.backend_api.prompts import build_batch_routing_prompt
+from src.backend_api.routing import RouteDecision, parse_batch_decisions
+from src.backend_api.sessions import current_session
+from src.backend_api.trace import current_trace, record
+
+logger = logging.getLogger("route_batcher")
+
+metrics.register_ratio("routing_batch.mean_size", "routing_batch.queries", "routing_batch.batches")
+metrics.register_ratio("routing_batch.fallback_rate", "routing_batch.fallbacks", "routing_batch.queries")
+
+
+def batch_messages(queries: List[str]) -> List[dict]:
+    listing = {"queries": [{"id": i, "query": q} for i, q in enumerate(queries)]}
+    return [
+        {"role": "system", "content": build_batch_routing_prompt()},
+        {"role": "user", "content": json.dumps(listing, ensure_ascii=False)},
+    ]
+
+
+class RoutingBatcher:
+    """
+    Collects routing requests for `window` seconds (or until `max_size`
+    are waiting) and decides them all with one structured-output call,
+    so concurrent requests share one prompt prefill instead of one each.
+    """
+
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def route(self, message: str) -> Optional[RouteDecision]:
+        """
+        The batch's decision for `message`, or None when the batch call
+        failed or gave no usable decision for it.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        decision, seconds, size = await future
+        if decision is not None:
+            record("llm", seconds, tools=True, profile="route_batch", batch=size)
+        return decision
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._decide(batch))
+
+    async def _decide(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # The call serves every request in the batch, not the one whose
+        # context this task inherited: no per-request trace, deadline, session
+        # or cancellation
+        current_trace.set(None)
+        current_budget.set(None)
+        current_session.set(None)
+        current_cancel.set(None)
+
+        started = time.monotonic()
+        try:
+            resp = await asyncio.to_thread(call_ollama, batch_messages([m for m, _ in batch]), profile="route_batch")
+            decisions = parse_batch_decisions(resp.get("message", {}).get("content", ""), len(batch))
+        except Exception as e:
+            logger.warning(f"Batched routing of {len(batch)} queries failed: {e}")
+            decisions = [None] * len(batch)
+        seconds = time.monotonic() - started
+
+        metrics.incr("routing_batch.batches")
+        metrics.incr("routing_batch.queries", len(batch))
+        metrics.incr("routing_batch.fallbacks", sum(1 for d in decisions if d is None))
+        for (_, future), decision in zip(batch, decisions):
+            # Waiters that gave up (deadline, disconnect) are cancelled
+            if not future.done():
+                future.set_result((decision, seconds, len(batch)))
+
+
+route_batcher = RoutingBatcher(ROUTING_BATCH_WINDOW_MS / 1000, ROUTING_BATCH_MAX_SIZE)
@@ -0,0 +1,39 @@
+# src/backend_api/route_cache.py
+import hashlib
+import json
+from typing import Optional, Sequence, Tuple
+
+from src.backend_api.cache import get_cache
+from src.backend_api.config import AGENT_MAX_STEPS, ROUTE_CACHE_TTL
+from src.backend_api.ollama_client import OLLAMA_MODEL
+from src.backend_api.profiles import PROFILES
+from src.backend_api.prompts import build_initial_system_prompt
+from src.backend_api.routing import RouteDecision, normalize_message
+from src.backend_api.tools import TOOLS
+
+route_cache = get_cache("route", ROUTE_CACHE_TTL)
+
+# Anything that can change the model's choice: tool schemas, routing
+# prompt, model and route profile. Editing one of them retires old entries.
+SCHEMA_VERSION = hashlib.sha256(json.dumps(
+    [TOOLS, build_initial_system_prompt("", AGENT_MAX_STEPS), OLLAMA_MODEL, PROFILES.get("route")],
+    sort_keys=True,
+).encode("utf-8")).hexdigest()[:16]
+
+
+def route_key(message: str, history: Sequence[Tuple[str, str]]) -> str:
+    # Follow-ups ("and tomorrow?") depend on what was asked before
+    previous = normalize_message(history[-1][0]) if history else ""
+    return f"{SCHEMA_VERSION}|{previous}|{normalize_message(message)}"
+
+
+def cached_decision(message: str, history: Sequence[Tuple[str, str]]) -> Optional[RouteDecision]:
+    entry = route_cache.get(route_key(message, history))
+    if entry is None:
+        return None
+    return RouteDecision(tool=entry["tool"], arguments=entry["arguments"])
+
+
+def remember_decision(message: str, history: Sequence[Tuple[str, str]], decision: RouteDecision) -> None:
+    # Only the choice is kept: direct answers are regenerated on a hit
+    route_cache.set(route_key(message, history), {"tool": decision.tool, "arguments": decision.arguments})
@@ -0,0 +1,136 @@
+# src/backend_api/routing.py
+import json
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Label used for "answer directly, no tool"
+NO_TOOL = "none"
+
+# Structured output of a batched routing call: one decision per query id
+BATCH_DECISIONS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "decisions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "tool": {"type": "string", "enum": ["get_weather", "get_date", "searchxng", NO_TOOL]},
+                    "location": {"type": "string"},
+                    "query": {"type": "string"},
+                },
+                "required": ["id", "tool"],
+            },
+        }
+    },
+    "required": ["decisions"],
+}
+# Argument each tool needs from a batched decision
+_BATCH_ARGUMENTS = {"get_weather": "location", "searchxng": "query", "get_date": None}
+
+_DATE_PATTERNS = re.compile(
+    r"\b(what(?:'s| is)? (?:the |today'?s? )?(?:current )?date|what day is (?:it|today)|today'?s date|"
+    r"current date|date today)\b"
+)
+_WEATHER_PATTERN = re.compile(r"\b(weather|forecast|temperature|raining|rain|snow(?:ing)?|sunny|humid(?:ity)?)\b")
+_LOCATION_PATTERN = re.compile(
+    r"\b(?:in|for|at|near)\s+([a-z][a-z .'-]*?)(?:\s+(?:today|tomorrow|now|right now|this week|tonight))?\s*[?.!]*$"
+)
+_SEARCH_PATTERN = re.compile(
+    r"\b(who|current|latest|news|president|prime minister|pm|ceo|population|capital|price|score|won|"
+    r"election|leader|today|recent|when did|where is|how many)\b"
+)
+
+
+@dataclass
+class RouteDecision:
+    """
+    Outcome of a routing step: the tool to call with its arguments, or
+    no tool (`tool` is None). `content` holds a direct answer when the
+    router produced one.
+    """
+    tool: Optional[str]
+    arguments: dict = field(default_factory=dict)
+    content: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.tool or NO_TOOL
+
+    def as_message(self) -> dict:
+        """
+        The assistant message a tool-calling model would have returned.
+        """
+        if not self.tool:
+            return {"role": "assistant", "content": self.content or ""}
+        return {"role": "assistant", "content": "",
+                "tool_calls": [{"function": {"name": self.tool, "arguments": self.arguments}}]}
+
+
+def normalize_message(message: str) -> str:
+    """
+    Lower-cased words only, so spacing, case and punctuation differences
+    map to the same routing decision.
+    """
+    return " ".join(re.findall(r"[\w']+", message.lower()))
+
+
+def decision_from_response(resp: dict) -> RouteDecision:
+    """
+    Read the first tool call (or the direct answer) out of an Ollama
+    /api/chat response.
+    """
+    message = resp.get("message", {})
+    tool_calls = message.get("tool_calls") or []
+    if not tool_calls:
+        return RouteDecision(tool=None, content=message.get("content", ""))
+    function = tool_calls[0]["function"]
+    return RouteDecision(tool=function["name"], arguments=function.get("arguments") or {})
+
+
+def parse_batch_decisions(content: str, count: int) -> List[Optional[RouteDecision]]:
+    """
+    Decisions for query ids 0..count-1 from a batched routing reply
+    (BATCH_DECISIONS_SCHEMA). Missing, unknown or incomplete entries come
+    back as None so those queries can be routed on their own.
+    """
+    decisions: List[Optional[RouteDecision]] = [None] * count
+    try:
+        entries = json.loads(content)["decisions"]
+    except (ValueError, KeyError, TypeError):
+        return decisions
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict) or not isinstance(entry.get("id"), int):
+            continue
+        index, tool = entry["id"], entry.get("tool")
+        if not 0 <= index < count or decisions[index] is not None:
+            continue
+        if tool == NO_TOOL:
+            decisions[index] = RouteDecision(tool=None)
+        elif tool in _BATCH_ARGUMENTS:
+            argument = _BATCH_ARGUMENTS[tool]
+            value = entry.get(argument) if argument else None
+            if argument and not (isinstance(value, str) and value.strip()):
+                continue
+            decisions[index] = RouteDecision(tool=tool, arguments={argument: value.strip()} if argument else {})
+    return decisions
+
+
+def rule_route(message: str) -> RouteDecision:
+    """
+    Keyword router mirroring the rules in build_initial_system_prompt.
+    Cheap and deterministic; used as a baseline for routing evaluation.
+    """
+    text = message.strip().lower()
+    if _DATE_PATTERNS.search(text):
+        return RouteDecision(tool="get_date")
+    if _WEATHER_PATTERN.search(text):
+        match = _LOCATION_PATTERN.search(text)
+        if match:
+            return RouteDecision(tool="get_weather", arguments={"location": match.group(1).strip().title()})
+    if _SEARCH_PATTERN.search(text):
+        return RouteDecision(tool="searchxng", arguments={"query": message.strip().rstrip("?")})
+    return RouteDecision(tool=None)
+
@@ -0,0 +1,23 @@
+# src/backend_api/schemas.py
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ChatRequest(BaseModel):
+    message: str
+    history: List[Tuple[str, str]] = []
+    # Seconds the client is willing to wait; defaults to REQUEST_BUDGET_SECONDS
+    timeout_seconds: Optional[float] = None
+    # Stable id of the conversation (generated by the frontend); lets the
+    # backend reuse the previous turn's context and pin an Ollama endpoint
+    session_id: Optional[str] = None
+    # Add a per-call timing breakdown (prefill/decode tokens and ms, tool
+    # time) to the response
+    include_timings: bool = False
+
+
+class ChatResponse(BaseModel):
+    response: str
+    error: Optional[str] = None
+    # Set when the request asked for include_timings
+    timings: Optional[Dict[str, Any]] = None
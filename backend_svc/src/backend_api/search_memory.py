@@ -0,0 +1,162 @@
+# src/backend_api/search_memory.py
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+
+from src.backend_api import metrics
+from src.backend_api.config import (
+    SEARCH_MEMORY_MAX_AGE,
+    SEARCH_MEMORY_MIN_COVERAGE,
+    SEARCH_MEMORY_PASSAGES,
+)
+from src.backend_api.utils import tokenize
+
+logger = logging.getLogger("search_memory")
+
+metrics.register_ratio("search_memory.hit_rate", "search_memory.hits", "search_memory.lookups")
+
+PASSAGE_CHARS = 400
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def chunk_text(text: str, max_chars: int = PASSAGE_CHARS) -> List[str]:
+    """
+    Split a snippet into passages of whole sentences, each at most
+    about max_chars long.
+    """
+    passages, current = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        passages.append(current)
+    return passages
+
+
+class PassageIndex:
+    """
+    BM25 index over a fixed number of passage slots. Slots are reused
+    oldest-first, and passages older than max_age are ignored, so memory
+    stays bounded and stale facts age out.
+    """
+
+    def __init__(self, capacity: int, max_age: float):
+        self.capacity = capacity
+        self.max_age = max_age
+        self.passages: List[dict] = [None] * capacity
+        self.terms: List[Counter] = [Counter() for _ in range(capacity)]
+        self.lengths = np.zeros(capacity, dtype=np.float32)
+        self.added_at = np.full(capacity, -np.inf)
+        # term -> {slot: term frequency}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        # (url, passage hash) -> slot, so re-indexing a result just refreshes it
+        self.slots_by_key: Dict[tuple, int] = {}
+        self.next_slot = 0
+        self.lock = threading.Lock()
+
+    def _clear_slot(self, slot: int) -> None:
+        for term in self.terms[slot]:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(slot, None)
+                if not postings:
+                    del self.postings[term]
+        old = self.passages[slot]
+        if old is not None:
+            self.slots_by_key.pop(old["key"], None)
+        self.terms[slot] = Counter()
+        self.lengths[slot] = 0
+        self.added_at[slot] = -np.inf
+        self.passages[slot] = None
+
+    def add(self, title: str, url: str, text: str) -> None:
+        key = (url, hashlib.sha1(text.encode("utf-8")).hexdigest())
+        with self.lock:
+            slot = self.slots_by_key.get(key)
+            if slot is not None:
+                self.added_at[slot] = time.time()
+                return
+
+            slot = self.next_slot
+            self.next_slot = (slot + 1) % self.capacity
+            self._clear_slot(slot)
+
+            terms = Counter(tokenize(f"{title} {text}"))
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[slot] = tf
+            self.terms[slot] = terms
+            self.lengths[slot] = sum(terms.values())
+            self.added_at[slot] = time.time()
+            self.passages[slot] = {"key": key, "title": title, "url": url, "content": text}
+            self.slots_by_key[key] = slot
+
+    def search(self, query: str, k: int = 3) -> List[dict]:
+        """
+        Fresh passages containing at least min_coverage of the query's
+        words, best BM25 score first.
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+
+        with self.lock:
+            live = self.added_at >= time.time() - self.max_age
+            n_live = int(live.sum())
+            if not n_live:
+                return []
+            avg_len = float(self.lengths[live].mean()) or 1.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths / avg_len)
+
+            scores = np.zeros(self.capacity, dtype=np.float32)
+            matched = np.zeros(self.capacity, dtype=np.int32)
+            for term in query_terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+                tfs = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+                idf = np.log(1 + (n_live - len(slots) + 0.5) / (len(slots) + 0.5))
+                scores[slots] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[slots])
+                matched[slots] += 1
+
+            eligible = live & (matched >= SEARCH_MEMORY_MIN_COVERAGE * len(query_terms))
+            candidates = np.flatnonzero(eligible)
+            if not len(candidates):
+                return []
+            best = candidates[np.argsort(-scores[candidates])][:k]
+            return [self.passages[i] for i in best]
+
+
+class SearchMemory:
+    """
+    Passages of past SearXNG results, consulted before going to the network.
+    """
+
+    def __init__(self, capacity: int, max_age: float):
+        self.index = PassageIndex(capacity, max_age)
+
+    def remember(self, results: list) -> None:
+        for result in results:
+            for passage in chunk_text(result.get("content", "")):
+                self.index.add(result.get("title", ""), result.get("url", ""), passage)
+                metrics.incr("search_memory.passages_indexed")
+
+    def recall(self, query: str, k: int = 3) -> list:
+        metrics.incr("search_memory.lookups")
+        passages = self.index.search(query, k)
+        if passages:
+            metrics.incr("search_memory.hits")
+            logger.debug(f"Answering '{query}' from {len(passages)} remembered passages")
+        return [{"title": p["title"], "url": p["url"], "content": p["content"]} for p in passages]
+
+
+search_memory = SearchMemory(SEARCH_MEMORY_PASSAGES, SEARCH_MEMORY_MAX_AGE)
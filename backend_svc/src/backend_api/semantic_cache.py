@@ -0,0 +1,98 @@
+# src/backend_api/semantic_cache.py
+import logging
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.backend_api import metrics
+from src.backend_api.config import (
+    SEMANTIC_CACHE_SIZE,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+)
+from src.backend_api.ollama_client import embed
+
+logger = logging.getLogger("semantic_cache")
+
+metrics.register_ratio("semantic_cache.hit_rate", "semantic_cache.hits", "semantic_cache.lookups")
+
+
+class VectorIndex:
+    """
+    Fixed-capacity ring buffer of unit vectors with payloads. The oldest
+    slot is overwritten when full, and entries older than `ttl` never match.
+    """
+
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.vectors = None  # (capacity, dim) float32, allocated on first add
+        self.added_at = np.full(capacity, -np.inf)
+        self.payloads: List[Any] = [None] * capacity
+        self.next_slot = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def add(self, vector, payload: Any) -> None:
+        v = self._normalize(vector)
+        with self.lock:
+            if self.vectors is None or self.vectors.shape[1] != v.shape[0]:
+                # First vector (or the embedding model changed): start over
+                self.vectors = np.zeros((self.capacity, v.shape[0]), dtype=np.float32)
+                self.added_at[:] = -np.inf
+            slot = self.next_slot
+            self.vectors[slot] = v
+            self.added_at[slot] = time.time()
+            self.payloads[slot] = payload
+            self.next_slot = (slot + 1) % self.capacity
+
+    def search(self, vector, k: int = 1) -> List[Tuple[float, Any]]:
+        """
+        Top-k live entries by cosine similarity, best first.
+        """
+        q = self._normalize(vector)
+        with self.lock:
+            if self.vectors is None or self.vectors.shape[1] != q.shape[0]:
+                return []
+            scores = self.vectors @ q
+            scores[self.added_at < time.time() - self.ttl] = -np.inf
+            k = min(k, self.capacity)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[i]), self.payloads[i]) for i in top if np.isfinite(scores[i])]
+
+
+class SemanticAnswerCache:
+    """
+    Answers to recent questions, looked up by meaning rather than by exact text.
+    """
+
+    def __init__(self, capacity: int, ttl: float, threshold: float):
+        self.index = VectorIndex(capacity, ttl)
+        self.threshold = threshold
+
+    def embed(self, message: str):
+        return embed([message])[0]
+
+    def lookup(self, vector) -> Optional[str]:
+        metrics.incr("semantic_cache.lookups")
+        matches = self.index.search(vector, k=1)
+        if not matches or matches[0][0] < self.threshold:
+            return None
+        score, (question, answer) = matches[0]
+        metrics.incr("semantic_cache.hits")
+        logger.debug(f"Semantic cache hit ({score:.3f}) on '{question}'")
+        return answer
+
+    def store(self, vector, message: str, answer: str) -> None:
+        self.index.add(vector, (message, answer))
+
+
+answer_cache = SemanticAnswerCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL, SEMANTIC_CACHE_THRESHOLD)
@@ -0,0 +1,68 @@
+# src/backend_api/sessions.py
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import List, Optional, Sequence, Tuple
+
+from src.backend_api import metrics
+from src.backend_api.config import SESSION_MAX_CHARS, SESSION_STORE_SIZE, SESSION_TTL
+
+# Conversation the current request belongs to (ChatRequest.session_id)
+current_session: ContextVar[Optional[str]] = ContextVar("current_session", default=None)
+
+metrics.register_ratio("sessions.reuse_rate", "sessions.reused", "sessions.lookups")
+
+
+class SessionStore:
+    """
+    The message list last sent to Ollama for each conversation. The next
+    turn appends to it instead of rebuilding it, so the model server finds
+    the previous turn's tokens as a prefix in its KV cache. Least recently
+    used sessions are dropped beyond `max_sessions`.
+    """
+
+    def __init__(self, max_sessions: int, ttl: float, max_chars: int):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_chars = max_chars
+        # session_id -> (messages, turns, last user message, saved at)
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def transcript(self, session_id: str, history: Sequence[Tuple[str, str]]) -> Optional[List[dict]]:
+        """
+        The stored messages followed by the answer of the last turn, if
+        `history` continues exactly where they stopped; None otherwise
+        (the caller rebuilds the messages from `history`).
+        """
+        metrics.incr("sessions.lookups")
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or not history:
+                return None
+            messages, turns, last_user, saved_at = entry
+            if time.monotonic() - saved_at > self.ttl or turns != len(history) or last_user != history[-1][0]:
+                del self._sessions[session_id]
+                metrics.incr("sessions.diverged")
+                return None
+            self._sessions.move_to_end(session_id)
+
+        extended = messages + [{"role": "assistant", "content": history[-1][1]}]
+        if len(json.dumps(extended)) > self.max_chars:
+            # A rebuilt, shorter context costs one full prefill but fits num_ctx
+            metrics.incr("sessions.overflows")
+            return None
+        metrics.incr("sessions.reused")
+        return extended
+
+    def save(self, session_id: str, messages: List[dict], history: Sequence[Tuple[str, str]], message: str) -> None:
+        with self._lock:
+            self._sessions[session_id] = (list(messages), len(history) + 1, message, time.monotonic())
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+
+sessions = SessionStore(SESSION_STORE_SIZE, SESSION_TTL, SESSION_MAX_CHARS)
@@ -0,0 +1,63 @@
+# src/backend_api/speculative.py
+import asyncio
+import logging
+from typing import Optional
+
+from src.backend_api import metrics
+from src.backend_api.config import SPECULATIVE_MIN_SIMILARITY
+from src.backend_api.tools import searchxng
+from src.backend_api.utils import tokenize
+
+logger = logging.getLogger("speculative")
+
+metrics.register_ratio("speculative_search.hit_rate",
+                       "speculative_search.hits", "speculative_search.started")
+
+
+def query_similarity(a: str, b: str) -> float:
+    """
+    Jaccard overlap of the content words of two queries.
+    """
+    ta, tb = set(tokenize(a)), set(tokenize(b))
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+class SpeculativeSearch:
+    """
+    A searchxng call started with the raw user message while the routing
+    LLM call is in flight. Its result is handed out only if the model
+    picks searchxng with a similar query; otherwise it is discarded.
+    """
+
+    def __init__(self, query: str):
+        self.query = query
+        self.task = asyncio.create_task(asyncio.to_thread(searchxng, query))
+        self.settled = False
+        metrics.incr("speculative_search.started")
+
+    async def claim(self, tool_name: str, tool_args: dict) -> Optional[str]:
+        """
+        Return the speculative result if it answers this tool call,
+        else discard it and return None.
+        """
+        model_query = tool_args.get("query", "") if tool_name == "searchxng" else ""
+        similarity = query_similarity(self.query, model_query) if model_query else 0.0
+        if similarity < SPECULATIVE_MIN_SIMILARITY:
+            logger.debug(f"Speculative miss ({similarity:.2f}): '{self.query}' vs {tool_name} {tool_args}")
+            self.discard()
+            return None
+
+        self.settled = True
+        metrics.incr("speculative_search.hits")
+        logger.debug(f"Speculative hit ({similarity:.2f}): '{self.query}' vs '{model_query}'")
+        return await self.task
+
+    def discard(self) -> None:
+        if self.settled:
+            return
+        self.settled = True
+        metrics.incr("speculative_search.wasted")
+        # The worker thread cannot be interrupted; cancelling just drops the result.
+        self.task.cancel()
@@ -0,0 +1,58 @@
+# src/backend_api/tool_selection.py
+import re
+from typing import Dict, List, Sequence, Tuple
+
+from src.backend_api import metrics
+
+metrics.register_ratio("routing.mean_prompt_chars", "routing.prompt_chars", "routing.prompts")
+metrics.register_ratio("routing.prompt_size_ratio", "routing.prompt_chars", "routing.prompt_chars_full")
+metrics.register_ratio("routing.mean_tools_offered", "routing.tools_offered", "routing.prompts")
+
+# Always offered: questions no keyword matches usually need a web search
+FALLBACK_TOOL = "searchxng"
+
+# Keyword weights per tool; a tool is offered once its score reaches
+# MIN_SCORE. Keep in step with the routing rules in prompts.TOOL_RULES.
+TOOL_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "get_weather": {
+        "weather": 2, "forecast": 2, "temperature": 2, "rain": 2, "raining": 2, "snow": 2, "snowing": 2,
+        "sunny": 2, "humid": 2, "humidity": 2, "wind": 1, "windy": 2, "storm": 1, "umbrella": 2,
+        "hot": 2, "cold": 2, "degrees": 1, "celsius": 2, "fahrenheit": 2,
+    },
+    "get_date": {
+        "date": 2, "day": 2, "weekday": 2, "today": 1, "today's": 1, "calendar": 1,
+    },
+}
+MIN_SCORE = 2.0
+
+
+def score_tools(message: str, history: Sequence[Tuple[str, str]] = ()) -> Dict[str, float]:
+    """
+    Keyword relevance of every tool to the message (and the previous user
+    message, which a follow-up like "and tomorrow?" depends on).
+    """
+    text = message if not history else f"{history[-1][0]} {message}"
+    words = re.findall(r"[a-z']+", text.lower())
+    return {tool: sum(weights.get(w, 0) for w in words) for tool, weights in TOOL_KEYWORDS.items()}
+
+
+def select_tools(message: str, history: Sequence[Tuple[str, str]] = (), limit: int = 2) -> List[str]:
+    """
+    Names of the tools worth offering for this message, best first, at
+    most `limit` (the fallback tool is always among them).
+    """
+    scores = score_tools(message, history)
+    ranked = sorted((t for t, s in scores.items() if s >= MIN_SCORE),
+                    key=lambda t: scores[t], reverse=True)
+    return ranked[:max(0, limit - 1)] + [FALLBACK_TOOL]
+
+
+def count_prompt_size(sent_chars: int, full_chars: int, tools_offered: int) -> None:
+    """
+    Size of a first routing call (system prompt plus tool schemas) next to
+    what offering every tool would have cost.
+    """
+    metrics.incr("routing.prompts")
+    metrics.incr("routing.prompt_chars", sent_chars)
+    metrics.incr("routing.prompt_chars_full", full_chars)
+    metrics.incr("routing.tools_offered", tools_offered)
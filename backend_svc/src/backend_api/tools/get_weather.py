@@ -1,12 +1,35 @@
-from src.backend_api.tools.searchxng import searchxng
+import logging
 
-def get_weather(location: str) -> str:
+from src.backend_api import metrics
+from src.backend_api.budget import DeadlineExceeded
+from src.backend_api.cancellation import RequestCancelled
+from src.backend_api.tools.searchxng import search_passages
+from src.backend_api.tools.weather_extract import FIELDS, extract_weather
+
+logger = logging.getLogger("get_weather")
+
+# Snippet kept for the model when no weather fields could be extracted
+FALLBACK_SNIPPET_CHARS = 400
+
+
+def get_weather(location: str) -> dict:
     # Create a query to get weather info for the location
     query = f"weather in {location}"
 
-    # Call the SearchXNG tool to get search results for the weather query
-    search_results = searchxng(query)
+    try:
+        results = search_passages(query)
+    except (DeadlineExceeded, RequestCancelled):
+        raise
+    except Exception as e:
+        logger.error(f"Error querying SearchXNG for '{query}': {e}", exc_info=True)
+        return {"location": location, "error": f"Error querying SearchXNG: {e}"}
 
-    # Optionally, parse or summarize search_results to pull out key weather details
-    # For simplicity, just return the raw search results here
-    return f"Weather information for {location}:\n{search_results}"
+    # Temperature, conditions, humidity, wind and forecast instead of raw snippets
+    record = extract_weather(location, results)
+    if any(field in record for field in FIELDS):
+        metrics.incr("weather.extracted")
+    else:
+        metrics.incr("weather.unparsed")
+        if results:
+            record["snippet"] = results[0]["content"].strip()[:FALLBACK_SNIPPET_CHARS]
+    return record
@@ -0,0 +1,110 @@
+import codecs
+import json
+from typing import Iterator, List
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = set("0123456789.eE+-")
+
+
+class JSONStreamTruncated(Exception):
+    """The byte cap was reached before the requested items were read."""
+
+
+class _Reader:
+    """
+    Text buffer over a stream of byte chunks that only holds the part not
+    yet consumed.
+    """
+
+    def __init__(self, chunks: Iterator[bytes], max_bytes: int):
+        self.chunks = chunks
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def read_more(self) -> bool:
+        if self.exhausted:
+            return False
+        if self.bytes_read >= self.max_bytes:
+            raise JSONStreamTruncated(f"stopped after {self.bytes_read} bytes")
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            self.buffer += self.decoder.decode(b"", final=True)
+            return False
+        self.bytes_read += len(chunk)
+        # Drop what has been consumed so memory stays bounded
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                raise ValueError("unexpected end of JSON")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.bytes_read - len(self.buffer) + self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode the next complete JSON value, reading more input until it
+        is all buffered.
+        """
+        self.peek()
+        decoder = json.JSONDecoder()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+                continue
+            # A number followed by nothing but number characters ("6." or "1e"
+            # at the end of a chunk) may continue in the next chunk
+            if (isinstance(value, (int, float)) and not isinstance(value, bool) and not self.exhausted
+                    and all(c in _NUMBER_CHARS for c in self.buffer[end:])):
+                if self.read_more():
+                    continue
+            self.pos = end
+            return value
+
+
+def first_array_items(chunks: Iterator[bytes], key: str, limit: int, max_bytes: int) -> List:
+    """
+    The first `limit` items of the array under top-level `key` of a JSON
+    object arriving as byte chunks. Stops reading as soon as they are in,
+    and never holds more than `max_bytes` of input: if the cap is hit,
+    the items read so far are returned. Other top-level values before
+    `key` are decoded and dropped; nothing after it is read.
+    """
+    reader = _Reader(chunks, max_bytes)
+    items = []
+    try:
+        reader.expect("{")
+        while reader.peek() != "}":
+            if reader.peek() == ",":
+                reader.pos += 1
+            name = reader.value()
+            reader.expect(":")
+            if name != key:
+                reader.value()
+                continue
+            reader.expect("[")
+            while len(items) < limit and reader.peek() != "]":
+                if reader.peek() == ",":
+                    reader.pos += 1
+                items.append(reader.value())
+            return items
+    except JSONStreamTruncated:
+        return items
+    return items
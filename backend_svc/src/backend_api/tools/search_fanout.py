@@ -0,0 +1,134 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.backend_api import metrics
+from src.backend_api.budget import DeadlineExceeded, current_budget
+from src.backend_api.cancellation import RequestCancelled
+from src.backend_api.config import (
+    SEARCH_FANOUT_BUDGET_SECONDS,
+    SEARCH_FANOUT_TARGETS,
+    SEARCH_FANOUT_WORKERS,
+)
+from src.backend_api.tools.searxng_client import fetch_results
+
+logger = logging.getLogger("searchxng")
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src")
+# A result counts towards "enough" only if it has a usable snippet
+MIN_SNIPPET_CHARS = 40
+
+_executor = ThreadPoolExecutor(max_workers=SEARCH_FANOUT_WORKERS, thread_name_prefix="search-fanout")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Comparison key for a URL, so the same page found by different engines
+    compares equal: no scheme, lower-case host without www., no fragment,
+    no tracking parameters, sorted query, no trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit(("", host, path, urlencode(query), ""))
+
+
+def merge_results(merged: Dict[str, dict], results: List[dict]) -> None:
+    """
+    Fold one engine's results into `merged` (canonical URL -> result).
+    Duplicates add up their scores, like SearXNG's own aggregation, and
+    keep the longest snippet.
+    """
+    for rank, result in enumerate(results, start=1):
+        score = result.get("score") or 1.0 / rank
+        key = canonical_url(result["url"])
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = {**result, "score": score, "engines": list(result.get("engines", []))}
+            continue
+        existing["score"] += score
+        existing["engines"] = sorted(set(existing["engines"]) | set(result.get("engines", [])))
+        if len(result.get("content", "")) > len(existing.get("content", "")):
+            existing["content"] = result["content"]
+
+
+def _target_params(target: str) -> dict:
+    # "category:news" queries a category, anything else is an engine name
+    if target.startswith("category:"):
+        return {"categories": target.split(":", 1)[1]}
+    return {"engines": target}
+
+
+def fanout_search(query: str, limit: int, targets: List[str] = None,
+                  budget_seconds: float = SEARCH_FANOUT_BUDGET_SECONDS) -> List[dict]:
+    """
+    Query each engine/category as its own concurrent SearXNG request and
+    return the merged top `limit` results as soon as `limit` good ones
+    are in, or when the latency budget runs out, whichever comes first.
+    Engines that have not answered by then are left behind. Raises when
+    no target answered at all (the first target's error, or a timeout).
+    """
+    targets = targets or SEARCH_FANOUT_TARGETS
+    request_budget = current_budget.get()
+    if request_budget is not None:
+        budget_seconds = min(budget_seconds, request_budget.remaining())
+    deadline = time.monotonic() + budget_seconds
+
+    # Each request runs in a copy of this context, so it sees the
+    # deadline and stops reading if the request is cancelled
+    pending = {
+        _executor.submit(copy_context().run, fetch_results, query, limit * 2, _target_params(t), budget_seconds): t
+        for t in targets
+    }
+    merged: Dict[str, dict] = {}
+    answered = 0
+    errors = []
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                metrics.incr("search.fanout.budget_expired")
+                logger.debug(f"Fan-out budget spent for '{query}', still waiting on {list(pending.values())}")
+                break
+            for future in done:
+                target = pending.pop(future)
+                try:
+                    merge_results(merged, future.result())
+                    answered += 1
+                except (DeadlineExceeded, RequestCancelled):
+                    raise
+                except Exception as e:
+                    errors.append(e)
+                    metrics.incr("search.fanout.engine_errors")
+                    logger.warning(f"Fan-out target {target} failed for '{query}': {e}")
+            good = [r for r in merged.values() if len(r.get("content", "")) >= MIN_SNIPPET_CHARS]
+            if len(good) >= limit:
+                metrics.incr("search.fanout.early_returns")
+                break
+    finally:
+        # Not-yet-started requests are dropped; running ones finish in the background
+        for future in pending:
+            future.cancel()
+        metrics.incr("search.fanout.abandoned", len(pending))
+
+    # An empty list would be cached as "no results": report the failure instead
+    if not answered:
+        metrics.incr("search.fanout.failures")
+        if request_budget is not None and request_budget.expired():
+            raise DeadlineExceeded(request_budget.seconds)
+        if errors:
+            raise errors[0]
+        raise TimeoutError(f"No fan-out target answered within {budget_seconds:g}s")
+
+    ranked = sorted(merged.values(), key=lambda r: (len(r.get("content", "")) >= MIN_SNIPPET_CHARS, r["score"]),
+                    reverse=True)
+    return ranked[:limit]
@@ -1,52 +1,83 @@
-import requests
 import logging
 
-SEARCHXNG_URL = "http://searchxng_svc:8080/search"  # Use internal Docker network name and port
-#SEARCHXNG_URL = "http://host.docker.internal:8181/search"  # Use internal Docker network name and port
+from src.backend_api.budget import DeadlineExceeded, current_budget
+from src.backend_api.cache import get_cache
+from src.backend_api.cache_warming import popularity
+from src.backend_api.cancellation import RequestCancelled
+from src.backend_api.config import CACHE_WARM_ENABLED, SEARCH_CACHE_TTL, SEARCH_MEMORY_ENABLED, SEARCH_MODE
+from src.backend_api.search_memory import search_memory
+from src.backend_api.tools.search_fanout import fanout_search
+from src.backend_api.tools.searxng_client import fetch_results
 
 logger = logging.getLogger("searchxng")
 
-def searchxng(query: str) -> str:
-    try:
-        headers1 = {
-            "X-Forwarded-For": "127.0.0.1",
-            "X-Real-IP": "127.0.0.1",
-            "SEARXNG_SECRET": "KNVP1nRBAAuGcm3BtKs4lVVxomF9VAeo6JqxEb_T_Uk"  # From your .env
-        }
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; backend_svc/1.0)",
-            "Accept": "application/json",
-            "Accept-Language": "en-US,en;q=0.9",
-            "X-Forwarded-For": "127.0.0.1",
-            "X-Real-IP": "127.0.0.1",
-            "SEARXNG_SECRET": "KNVP1nRBAAuGcm3BtKs4lVVxomF9VAeo6JqxEb_T_Uk"  # From your .env
-        }
-        params = {
-            'q': query,
-            'format': 'json',  # Request JSON output
-            'language': 'en',
-            'count': 2        # Limit to top 2 results
-        }
-        #response = requests.get(SEARCHXNG_URL,params=params, timeout=500)
-        response = requests.get(SEARCHXNG_URL, headers=headers,params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+MAX_RESULTS = 3
+
+search_cache = get_cache("search", SEARCH_CACHE_TTL)
+
 
+def search_results(query: str, refresh: bool = False) -> list:
+    """
+    Top results for `query` as [{"title", "url", "content"}], served from
+    the shared cache when fresh. Raises on SearXNG errors; errors and empty
+    results are not cached.
+    """
+    if not refresh:
+        cached = search_cache.get(query)
+        if cached is not None:
+            return cached
+
+    if SEARCH_MODE == "fanout":
+        raw = fanout_search(query, MAX_RESULTS)
+    else:
         # Extract top 3 results safely
-        results = data.get('results', [])[:3]
-        if not results:
-            return f"No results found for '{query}'."
+        raw = fetch_results(query, MAX_RESULTS)
+
+    results = [{"title": r["title"], "url": r["url"], "content": r["content"]} for r in raw]
+    # Results cut short by a spent request deadline may be incomplete, and
+    # an empty list is usually SearXNG's engines being rate-limited for a moment
+    budget = current_budget.get()
+    if results and (budget is None or not budget.expired()):
+        search_cache.set(query, results)
+    if SEARCH_MEMORY_ENABLED:
+        search_memory.remember(results)
+    return results
+
 
-        result_texts = []
-        for i, result in enumerate(results, start=1):
-            title = result.get('title', 'No title')
-            url = result.get('url', 'No URL')
-            snippet = result.get('content', '')[:1200]  # Optional snippet trimming
+def format_results(query: str, results: list) -> str:
+    if not results:
+        return f"No results found for '{query}'."
 
-            entry = f"{i}. {title}\nURL: {url}\nSnippet: {snippet.strip()}\n"
-            result_texts.append(entry)
+    result_texts = []
+    for i, result in enumerate(results, start=1):
+        entry = f"{i}. {result['title']}\nURL: {result['url']}\nSnippet: {result['content'].strip()}\n"
+        result_texts.append(entry)
 
-        return "\n".join(result_texts)
+    return "\n".join(result_texts)
+
+
+def search_passages(query: str) -> list:
+    """
+    Results for `query` as [{"title", "url", "content"}]: passages already
+    in search memory when they cover it, fresh or cached search results
+    otherwise. Raises on SearXNG errors.
+    """
+    if CACHE_WARM_ENABLED:
+        # Weather lookups come through here too, as "weather in <location>"
+        popularity.observe(query)
+    # Recurring topics can be answered from passages we already fetched
+    if SEARCH_MEMORY_ENABLED:
+        passages = search_memory.recall(query, k=MAX_RESULTS)
+        if passages:
+            return passages
+    return search_results(query)
+
+
+def searchxng(query: str) -> str:
+    try:
+        return format_results(query, search_passages(query))
+    except (DeadlineExceeded, RequestCancelled):
+        raise
     except Exception as e:
         logger.error(f"Error querying SearchXNG for '{query}': {e}", exc_info=True)
         return f"Error querying SearchXNG: {e}"
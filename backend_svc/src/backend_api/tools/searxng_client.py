@@ -0,0 +1,64 @@
+import logging
+import os
+
+from src.backend_api import metrics
+from src.backend_api.budget import call_timeout
+from src.backend_api.cancellation import cancellable, check_cancelled
+from src.backend_api.config import SEARCH_MAX_RESPONSE_BYTES
+from src.backend_api.http_client import SESSION
+from src.backend_api.tools.json_stream import first_array_items
+
+SEARCHXNG_URL = os.getenv("SEARCHXNG_URL", "http://searchxng_svc:8080/search")  # Use internal Docker network name and port
+#SEARCHXNG_URL = "http://host.docker.internal:8181/search"  # Use internal Docker network name and port
+
+logger = logging.getLogger("searchxng")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; backend_svc/1.0)",
+    "Accept": "application/json",
+    "Accept-Language": "en-US,en;q=0.9",
+    "X-Forwarded-For": "127.0.0.1",
+    "X-Real-IP": "127.0.0.1",
+    "SEARXNG_SECRET": "KNVP1nRBAAuGcm3BtKs4lVVxomF9VAeo6JqxEb_T_Uk"  # From your .env
+}
+MAX_SNIPPET_CHARS = 1200
+READ_CHUNK_BYTES = 16 * 1024
+
+
+def fetch_results(query: str, limit: int, extra_params: dict = None, timeout: float = 10) -> list:
+    """
+    First `limit` results of one SearXNG request as
+    [{"title", "url", "content", "score", "engines"}]. Raises on HTTP errors.
+    """
+    params = {
+        'q': query,
+        'format': 'json',  # Request JSON output
+        'language': 'en',
+        'count': 2        # Limit to top 2 results
+    }
+    if extra_params:
+        params.update(extra_params)
+    #response = requests.get(SEARCHXNG_URL,params=params, timeout=500)
+    # Read the body incrementally: stop after `limit` results and never
+    # buffer more than SEARCH_MAX_RESPONSE_BYTES, however big the payload is,
+    # and drop the connection if the request is cancelled meanwhile
+    check_cancelled()
+    with SESSION.get(SEARCHXNG_URL, headers=HEADERS, params=params,
+                     timeout=call_timeout(timeout), stream=True) as response:
+        response.raise_for_status()
+        chunks = cancellable(response.iter_content(chunk_size=READ_CHUNK_BYTES))
+        results = first_array_items(chunks, "results", limit, SEARCH_MAX_RESPONSE_BYTES)
+    metrics.incr("search.responses")
+    if len(results) < limit:
+        metrics.incr("search.short_responses")
+
+    return [
+        {
+            "title": result.get('title', 'No title'),
+            "url": result.get('url', 'No URL'),
+            "content": (result.get('content') or '')[:MAX_SNIPPET_CHARS],  # Optional snippet trimming
+            "score": result.get('score', 0.0),
+            "engines": result.get('engines') or [result.get('engine', '')],
+        }
+        for result in results
+    ]
@@ -0,0 +1,116 @@
+# src/backend_api/tools/weather_extract.py
+"""
+Pull weather fields out of search result snippets, so get_weather can
+hand the model a few short fields instead of three pages of text.
+"""
+import re
+from typing import Optional
+
+_NUMBER = r"(-?\d{1,3}(?:[.,]\d)?)"
+_UNIT = r"\s*(?:°|º|deg(?:rees?)?\.?)\s*(c|f|celsius|fahrenheit)\b"
+
+TEMPERATURE = re.compile(_NUMBER + _UNIT, re.IGNORECASE)
+HUMIDITY = re.compile(r"humidity\D{0,12}(\d{1,3})\s*%|(\d{1,3})\s*%\s*(?:relative\s+)?humidity", re.IGNORECASE)
+WIND = re.compile(
+    r"\bwinds?\b[^0-9]{0,24}?(?:\b([nsew]{1,3})\b\s*)?(?:at\s+)?(\d{1,3}(?:[.,]\d)?)\s*(km/h|kmh|kph|mph|m/s|knots|kt)\b",
+    re.IGNORECASE,
+)
+CONDITIONS = re.compile(
+    r"\b(thunderstorms?|heavy rain|light rain|rain showers|showers|drizzle|rain|sleet|heavy snow|light snow|snow|"
+    r"freezing fog|fog|mist|haze|overcast|mostly cloudy|partly cloudy|cloudy|partly sunny|mostly sunny|sunny|"
+    r"clear skies|clear)\b",
+    re.IGNORECASE,
+)
+HIGH = re.compile(r"\bhighs?\b(?:\s+(?:of|near|around|to))?\s*:?\s*" + _NUMBER + r"(?:" + _UNIT + r")?", re.IGNORECASE)
+LOW = re.compile(r"\blows?\b(?:\s+(?:of|near|around|to))?\s*:?\s*" + _NUMBER + r"(?:" + _UNIT + r")?", re.IGNORECASE)
+
+FIELDS = ("temperature", "conditions", "humidity", "wind", "forecast")
+
+
+def _degrees(value: str, unit: Optional[str]) -> str:
+    value = value.replace(",", ".")
+    return f"{value}°{unit[0].upper()}" if unit else f"{value}°"
+
+
+def _forecast(text: str) -> Optional[str]:
+    parts = []
+    for label, pattern in (("high", HIGH), ("low", LOW)):
+        match = pattern.search(text)
+        if match:
+            parts.append(f"{label} {_degrees(match.group(1), match.group(2))}")
+    return ", ".join(parts) or None
+
+
+def extract_fields(text: str) -> dict:
+    """
+    Weather fields found in one snippet (missing ones left out).
+    """
+    fields = {}
+    match = TEMPERATURE.search(text)
+    if match:
+        fields["temperature"] = _degrees(match.group(1), match.group(2))
+    match = CONDITIONS.search(text)
+    if match:
+        fields["conditions"] = match.group(1).lower()
+    match = HUMIDITY.search(text)
+    if match:
+        fields["humidity"] = f"{match.group(1) or match.group(2)}%"
+    match = WIND.search(text)
+    if match:
+        direction = f" {match.group(1).upper()}" if match.group(1) else ""
+        fields["wind"] = f"{match.group(2).replace(',', '.')} {match.group(3).lower()}{direction}"
+    forecast = _forecast(text)
+    if forecast:
+        fields["forecast"] = forecast
+    return fields
+
+
+def extract_weather(location: str, results: list) -> dict:
+    """
+    {"location", <fields>, "sources"} from search results, best-ranked
+    snippet first: each field comes from the first snippet that has it.
+    """
+    record = {"location": location}
+    sources = []
+    for result in results:
+        text = f"{result.get('title', '')}. {result.get('content', '')}"
+        found = {k: v for k, v in extract_fields(text).items() if k not in record}
+        if found:
+            record.update(found)
+            sources.append(result.get("url", ""))
+        if all(k in record for k in FIELDS):
+            break
+    record["sources"] = sources
+    return record
+
+
+def format_weather(record: dict) -> str:
+    """
+    One compact line for the follow-up prompt.
+    """
+    fields = "; ".join(f"{k}: {record[k]}" for k in FIELDS if k in record)
+    return f"Weather for {record['location']}: {fields or 'no details found'}"
+
+
+def render_weather_answer(record: dict) -> Optional[str]:
+    """
+    Plain-language answer straight from the record, or None when it lacks
+    a temperature (the model answers instead).
+    """
+    if "temperature" not in record:
+        return None
+    answer = f"It is currently {record['temperature']}"
+    if "conditions" in record:
+        answer += f" and {record['conditions']}"
+    answer += f" in {record['location']}."
+    extras = []
+    if "humidity" in record:
+        extras.append(f"humidity is {record['humidity']}")
+    if "wind" in record:
+        extras.append(f"wind is {record['wind']}")
+    if extras:
+        sentence = " and ".join(extras)
+        answer += f" {sentence[0].upper()}{sentence[1:]}."
+    if "forecast" in record:
+        answer += f" Forecast: {record['forecast']}."
+    return answer
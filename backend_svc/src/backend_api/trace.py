@@ -0,0 +1,134 @@
+# src/backend_api/trace.py
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# Fields of Ollama's final response that describe where time went
+OLLAMA_TIMING_FIELDS = (
+    "total_duration", "load_duration",
+    "prompt_eval_count", "prompt_eval_duration",
+    "eval_count", "eval_duration",
+)
+
+
+class RequestTrace:
+    """
+    What happened while serving one request: every upstream call with its
+    latency, the tools the model chose, and the final answer.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.events = []
+        self.response = None
+        # Pipeline phase in flight ("route", "tool" or "answer") and since when
+        self.phase = None
+        self.phase_started = None
+
+    def add(self, kind: str, seconds: float, **fields) -> None:
+        event = {"k": kind, "at": round(time.monotonic() - self.started, 4), "s": round(seconds, 4)}
+        event.update(fields)
+        # list.append is atomic, so worker threads can record concurrently
+        self.events.append(event)
+
+
+# Trace of the request being served; worker threads started with
+# asyncio.to_thread inherit it.
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+def record(kind: str, seconds: float, **fields) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(kind, seconds, **fields)
+
+
+def enter_phase(phase: str) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.phase = phase
+        trace.phase_started = time.monotonic()
+
+
+def ollama_timings(response: dict) -> dict:
+    return {f: response[f] for f in OLLAMA_TIMING_FIELDS if f in response}
+
+
+def start_trace() -> RequestTrace:
+    """
+    The current request's trace, starting one if nothing (such as the
+    traffic recorder) has yet.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        trace = RequestTrace()
+        current_trace.set(trace)
+    return trace
+
+
+def _ms(nanoseconds: int) -> float:
+    return round(nanoseconds / 1e6, 1)
+
+
+def _per_second(count: int, milliseconds: float) -> float:
+    return round(count / (milliseconds / 1000), 1) if milliseconds else 0.0
+
+
+def timing_summary(trace: RequestTrace) -> dict:
+    """
+    Where a request's time went: each LLM call split into model load,
+    prefill (prompt eval) and decode (eval) with token counts, each tool
+    call, and the totals with tokens per second. "bound" names the phase
+    that took longer, prefill or decode.
+    """
+    calls = []
+    totals = {"llm_ms": 0.0, "load_ms": 0.0, "prompt_tokens": 0, "prompt_ms": 0.0,
+              "eval_tokens": 0, "eval_ms": 0.0, "tool_ms": 0.0}
+    for event in trace.events:
+        if event["k"] == "llm":
+            call = {
+                "kind": "llm",
+                "profile": event.get("profile"),
+                "ms": round(event["s"] * 1000, 1),
+                "load_ms": _ms(event.get("load_duration", 0)),
+                "prompt_tokens": event.get("prompt_eval_count", 0),
+                "prompt_ms": _ms(event.get("prompt_eval_duration", 0)),
+                "eval_tokens": event.get("eval_count", 0),
+                "eval_ms": _ms(event.get("eval_duration", 0)),
+            }
+            totals["llm_ms"] += call["ms"]
+            for field in ("load_ms", "prompt_tokens", "prompt_ms", "eval_tokens", "eval_ms"):
+                totals[field] += call[field]
+        elif event["k"] == "tool":
+            call = {"kind": "tool", "name": event.get("name"), "ms": round(event["s"] * 1000, 1)}
+            totals["tool_ms"] += call["ms"]
+        else:
+            continue
+        calls.append(call)
+
+    summary = {field: round(value, 1) for field, value in totals.items()}
+    summary["total_ms"] = round((time.monotonic() - trace.started) * 1000, 1)
+    summary["prompt_tokens_per_second"] = _per_second(totals["prompt_tokens"], totals["prompt_ms"])
+    summary["eval_tokens_per_second"] = _per_second(totals["eval_tokens"], totals["eval_ms"])
+    if totals["prompt_ms"] or totals["eval_ms"]:
+        summary["bound"] = "prefill" if totals["prompt_ms"] > totals["eval_ms"] else "decode"
+    summary["calls"] = calls
+    return summary
+
+
+def server_timing(summary: dict) -> str:
+    """
+    The summary as a Server-Timing header value (durations in ms), shown
+    by browser dev tools next to the request.
+    """
+    entries = [
+        ("load", summary["load_ms"], "model load"),
+        ("prefill", summary["prompt_ms"], f"{summary['prompt_tokens']} prompt tokens"),
+        ("decode", summary["eval_ms"], f"{summary['eval_tokens']} generated tokens"),
+        ("llm", summary["llm_ms"], f"calls: {sum(1 for c in summary['calls'] if c['kind'] == 'llm')}"),
+        ("tool", summary["tool_ms"], f"calls: {sum(1 for c in summary['calls'] if c['kind'] == 'tool')}"),
+        ("total", summary["total_ms"], None),
+    ]
+    return ", ".join(
+        f"{name};dur={value}" + (f';desc="{desc}"' if desc else "") for name, value, desc in entries
+    )
@@ -1,14 +1,41 @@
 # src/backend_api/utils.py
+import re
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "of", "in", "on", "for",
+    "to", "and", "or", "what", "who", "whats", "which", "how", "me", "tell",
+    "please", "can", "you", "do", "does", "current", "currently", "now",
+}
+
+
+def tokenize(text: str) -> list:
+    """
+    Lower-cased alphanumeric words, stopwords removed.
+    """
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in _STOPWORDS]
+
 
 def summarize_tool_results(tool_output, user_query: str) -> str:
     """
     Create a compact summary of tool output so the LLM is not overwhelmed.
     """
 
-    # Weather/date tools return strings
+    # The date tool (and tool errors) return strings
     if isinstance(tool_output, str):
         return f"Tool result: {tool_output}"
 
+    # get_weather returns a record of extracted fields
+    if isinstance(tool_output, dict) and "location" in tool_output:
+        # Imported here: the tools package imports this module
+        from src.backend_api.tools.weather_extract import format_weather
+
+        if "error" in tool_output:
+            return f"Tool result: {tool_output['error']}"
+        summary = format_weather(tool_output)
+        if "snippet" in tool_output:
+            summary += f"\nSnippet: {tool_output['snippet']}"
+        return summary
+
     # searchxng returns a dict with "results"
     if isinstance(tool_output, dict) and "results" in tool_output:
         results = tool_output["results"]
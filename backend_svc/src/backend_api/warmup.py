@@ -0,0 +1,99 @@
+# src/backend_api/warmup.py
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from src.backend_api.config import (
+    AGENT_MAX_STEPS,
+    OLLAMA_KEEP_ALIVE,
+    SESSION_REUSE_ENABLED,
+    WARMUP_CONNECTIONS,
+    WARMUP_MODELS,
+    WARMUP_RETRY_SECONDS,
+)
+from src.backend_api.http_client import SESSION
+from src.backend_api.ollama_client import OLLAMA_MODEL, OLLAMA_URL, OLLAMA_URLS, call_ollama
+from src.backend_api.profiles import PROFILES
+from src.backend_api.prompts import build_routing_messages
+from src.backend_api.tools import TOOLS
+from src.backend_api.tools.searxng_client import SEARCHXNG_URL
+
+logger = logging.getLogger("warmup")
+
+# Shared with the /ready endpoint
+READINESS = {"ready": False, "steps": {}}
+
+SYNTHETIC_QUERY = "What is the weather in Paris?"
+
+
+def preload_models():
+    """
+    An empty chat request makes Ollama load the model and keep it resident.
+    Each profile's model is loaded with its num_ctx, since a different
+    context size would make Ollama reload the model on first use.
+    Every endpoint in OLLAMA_URLS is loaded.
+    """
+    loads = {(model, None) for model in WARMUP_MODELS or [OLLAMA_MODEL]}
+    for profile in PROFILES.values():
+        loads.discard((profile.get("model", OLLAMA_MODEL), None))
+        loads.add((profile.get("model", OLLAMA_MODEL), profile.get("options", {}).get("num_ctx")))
+    for url in OLLAMA_URLS:
+        for model, num_ctx in sorted(loads, key=str):
+            payload = {"model": model, "messages": [], "keep_alive": OLLAMA_KEEP_ALIVE}
+            if num_ctx:
+                payload["options"] = {"num_ctx": num_ctx}
+            SESSION.post(url, json=payload, timeout=300).raise_for_status()
+
+
+def open_connection_pools():
+    """
+    Fire concurrent cheap requests at each upstream so the shared session
+    holds several open connections before real traffic arrives.
+    """
+    urls = [urljoin(OLLAMA_URL, "/api/version"), urljoin(SEARCHXNG_URL, "/healthz")]
+    with ThreadPoolExecutor(max_workers=WARMUP_CONNECTIONS) as pool:
+        for url in urls:
+            responses = pool.map(lambda u: SESSION.get(u, timeout=10), [url] * WARMUP_CONNECTIONS)
+            for resp in responses:
+                resp.raise_for_status()
+
+
+def synthetic_routing_call():
+    # In session mode this also caches the static system prompt's prefix
+    messages = build_routing_messages(SYNTHETIC_QUERY, max_tool_calls=AGENT_MAX_STEPS, static_system=SESSION_REUSE_ENABLED)
+    call_ollama(messages, tools=TOOLS, profile="route")
+
+
+WARMUP_STEPS = [
+    ("preload_models", preload_models),
+    ("connection_pools", open_connection_pools),
+    ("routing_call", synthetic_routing_call),
+]
+
+
+async def run_warmup():
+    """
+    Run every warm-up step, retrying failed ones until they all pass,
+    then mark the replica ready.
+    """
+    pending = list(WARMUP_STEPS)
+    while pending:
+        failed = []
+        for name, step in pending:
+            started = time.monotonic()
+            try:
+                await asyncio.to_thread(step)
+                READINESS["steps"][name] = f"ok ({time.monotonic() - started:.1f}s)"
+                logger.info(f"Warm-up step {name} done in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                READINESS["steps"][name] = f"failed: {e}"
+                logger.warning(f"Warm-up step {name} failed: {e}")
+                failed.append((name, step))
+        pending = failed
+        if pending:
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+    READINESS["ready"] = True
+    logger.info("Warm-up complete, replica is ready")
@@ -0,0 +1,16 @@
+import pytest
+
+from src.backend_api.cache import Cache, CacheStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CacheStore(str(tmp_path / "cache.sqlite3"), max_bytes=1 << 20)
+
+
+@pytest.fixture
+def make_cache(store):
+    """
+    A cache namespace backed by a fresh store in tmp_path.
+    """
+    return lambda namespace, ttl=60: Cache(store, namespace, ttl)
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from src.backend_api import pipeline
+from src.backend_api.budget import DEFAULT_ESTIMATES, LatencyBudget, LatencyEstimator
+from src.backend_api.schemas import ChatRequest
+
+
+def tool_reply(name, arguments):
+    return {"message": {"role": "assistant", "content": "",
+                        "tool_calls": [{"function": {"name": name, "arguments": arguments}}]}}
+
+
+def text_reply(content):
+    return {"message": {"role": "assistant", "content": content}, "done_reason": "stop"}
+
+
+class FakeModel:
+    """
+    Scripted routing replies, a date tool and a two-chunk streamed answer.
+    """
+
+    def __init__(self, *routing_replies):
+        self.routing_replies = list(routing_replies)
+        self.routed = []
+        self.tool_calls = []
+        self.answered = []
+
+    def call_ollama(self, messages, tools=None, profile=None):
+        self.routed.append(list(messages))
+        return self.routing_replies.pop(0)
+
+    def dispatch_tool(self, name, arguments):
+        self.tool_calls.append((name, arguments))
+        return "2026-10-19"
+
+    def stream_ollama(self, messages, profile=None):
+        self.answered.append(messages)
+        yield "It is "
+        yield "Monday."
+
+
+@pytest.fixture
+def model(monkeypatch):
+    def install(*routing_replies, max_steps=1):
+        fake = FakeModel(*routing_replies)
+        monkeypatch.setattr(pipeline, "call_ollama", fake.call_ollama)
+        monkeypatch.setattr(pipeline, "dispatch_tool", fake.dispatch_tool)
+        monkeypatch.setattr(pipeline, "stream_ollama", fake.stream_ollama)
+        monkeypatch.setattr(pipeline, "AGENT_MAX_STEPS", max_steps)
+        monkeypatch.setattr(pipeline, "estimator", LatencyEstimator(DEFAULT_ESTIMATES))
+        return fake
+    return install
+
+
+def run(message, seconds=60):
+    async def collect():
+        used_tools = []
+        request = ChatRequest(message=message, history=[])
+        chunks = [c async for c in pipeline.run_tools(request, LatencyBudget(seconds), used_tools)]
+        return chunks, used_tools
+    return asyncio.run(collect())
+
+
+def test_one_tool_then_streamed_answer(model):
+    fake = model(tool_reply("get_date", {}))
+    chunks, used_tools = run("What day is it?")
+    assert chunks == ["It is ", "Monday."]
+    assert used_tools == ["get_date"]
+    assert len(fake.routed) == 1
+    assert fake.tool_calls == [("get_date", {})]
+    assert fake.answered[0][-1] == {"role": "tool", "tool_call_id": "call_0", "content": '"2026-10-19"'}
+
+
+def test_direct_answer_needs_no_tool_or_second_call(model):
+    fake = model(text_reply("Hello!"))
+    chunks, used_tools = run("Hi")
+    assert chunks == ["Hello!"]
+    assert used_tools == []
+    assert fake.answered == []
+
+
+def test_model_stops_chaining_when_it_needs_no_more_tools(model):
+    fake = model(tool_reply("get_date", {}), text_reply("draft"), max_steps=3)
+    chunks, used_tools = run("What day is it?")
+    # The routing draft is dropped in favour of the streamed answer
+    assert chunks == ["It is ", "Monday."]
+    assert used_tools == ["get_date"]
+    assert len(fake.routed) == 2
+    # The second round sees the first tool's result
+    assert fake.routed[1][-1]["role"] == "tool"
+
+
+def test_no_further_round_without_time_for_the_answer(model):
+    fake = model(tool_reply("get_date", {}), tool_reply("searchxng", {"query": "x"}), max_steps=3)
+    # The answer is still expected to take DEFAULT_ESTIMATES["answer"] seconds
+    chunks, used_tools = run("What day is it?", seconds=DEFAULT_ESTIMATES["answer"] / 2)
+    assert chunks == ["It is ", "Monday."]
+    assert used_tools == ["get_date"]
+    assert len(fake.routed) == 1
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.backend_api.budget import (
+    DeadlineExceeded,
+    LatencyBudget,
+    LatencyEstimator,
+    call_timeout,
+    current_budget,
+)
+from src.backend_api.pipeline import bind_request, within_deadline
+from src.backend_api.schemas import ChatRequest
+from src.backend_api.sessions import current_session
+
+
+def test_call_timeout_is_capped_by_the_deadline():
+    async def run():
+        current_budget.set(LatencyBudget(0.5))
+        assert call_timeout(10) <= 0.5
+        current_budget.set(LatencyBudget(0))
+        with pytest.raises(DeadlineExceeded):
+            call_timeout(10)
+
+    asyncio.run(run())
+
+
+def test_estimator_replaces_the_guess_then_averages():
+    estimator = LatencyEstimator({"route": 5.0}, alpha=0.5)
+    assert estimator.measured("route") == 0.0
+    estimator.observe("route", 1.0)
+    assert estimator.expected("route") == estimator.measured("route") == 1.0
+    estimator.observe("route", 3.0)
+    assert estimator.expected("route") == 2.0
+
+
+def test_request_context_reaches_every_chunk():
+    budget = LatencyBudget(30)
+
+    async def pipeline():
+        for _ in range(3):
+            yield (current_budget.get(), current_session.get())
+            await asyncio.sleep(0)
+
+    async def run():
+        bind_request(ChatRequest(message="hi", session_id="s1"), budget)
+        return [chunk async for chunk in within_deadline(pipeline(), budget)]
+
+    assert asyncio.run(run()) == [(budget, "s1")] * 3
+
+
+def test_within_deadline_stops_a_slow_pipeline():
+    async def pipeline():
+        yield "first"
+        await asyncio.sleep(5)
+        yield "never"
+
+    async def run():
+        chunks = []
+        with pytest.raises(DeadlineExceeded):
+            async for chunk in within_deadline(pipeline(), LatencyBudget(0.2)):
+                chunks.append(chunk)
+        return chunks
+
+    assert asyncio.run(run()) == ["first"]
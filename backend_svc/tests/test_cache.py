@@ -0,0 +1,79 @@
+import importlib
+
+from src.backend_api.cache import CacheStore
+
+# The module, not the tool function tools/__init__ exports under the same name
+searchxng = importlib.import_module("src.backend_api.tools.searchxng")
+
+VALUE = "x" * 100  # 102 bytes as JSON
+
+
+def test_values_round_trip_per_namespace(make_cache):
+    search, route = make_cache("search"), make_cache("route")
+    search.set("paris weather", [{"title": "Paris", "score": 1.5}])
+    assert search.get("paris weather") == [{"title": "Paris", "score": 1.5}]
+    assert route.get("paris weather") is None
+
+
+def test_entries_expire(make_cache):
+    cache = make_cache("search")
+    cache.set("stale", VALUE, ttl=-1)
+    assert cache.get("stale") is None
+
+
+def test_shared_between_store_instances(tmp_path):
+    # Another worker opening the same file sees the entry
+    path = str(tmp_path / "cache.sqlite3")
+    CacheStore(path, 1 << 20).set("search", "k", VALUE, 60)
+    assert CacheStore(path, 1 << 20).get("search", "k") == VALUE
+
+
+def test_evict_drops_expired_entries(store):
+    store.set("search", "stale", VALUE, ttl=-1)
+    store.set("search", "fresh", VALUE, ttl=60)
+    store.evict()
+    rows = store._conn().execute("SELECT key FROM entries").fetchall()
+    assert rows == [("fresh",)]
+
+
+def test_evict_drops_least_recently_used_down_to_the_watermark(tmp_path):
+    store = CacheStore(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+    for key in ("a", "b", "c"):
+        store.set("search", key, VALUE, ttl=60)
+    # "a" was read most recently, "b" least
+    conn = store._conn()
+    for key, accessed_at in (("a", 300.0), ("b", 100.0), ("c", 200.0)):
+        conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (accessed_at, key))
+    store.evict()
+    assert store.get("search", "b") is None
+    assert store.get("search", "a") == VALUE
+    assert store.get("search", "c") == VALUE
+
+
+def test_evict_keeps_everything_under_the_cap(tmp_path):
+    store = CacheStore(str(tmp_path / "cache.sqlite3"), max_bytes=1000)
+    store.set("search", "a", VALUE, ttl=60)
+    store.set("route", "a", VALUE, ttl=60)
+    store.evict()
+    assert store.get("search", "a") == VALUE
+    assert store.get("route", "a") == VALUE
+
+
+def test_search_results_are_cached_but_empty_ones_are_not(make_cache, monkeypatch):
+    calls = []
+
+    def fetch(query, limit):
+        calls.append(query)
+        if query == "rate limited":
+            return []
+        return [{"title": "T", "url": "https://example.com", "content": "snippet", "score": 1.0}]
+
+    monkeypatch.setattr(searchxng, "search_cache", make_cache("search"))
+    monkeypatch.setattr(searchxng, "SEARCH_MODE", "single")
+    monkeypatch.setattr(searchxng, "SEARCH_MEMORY_ENABLED", False)
+    monkeypatch.setattr(searchxng, "fetch_results", fetch)
+
+    for _ in range(2):
+        assert searchxng.search_results("paris")[0]["title"] == "T"
+        assert searchxng.search_results("rate limited") == []
+    assert calls == ["paris", "rate limited", "rate limited"]
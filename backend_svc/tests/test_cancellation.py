@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from src.backend_api import cancellation, metrics, pipeline
+from src.backend_api.budget import DEFAULT_ESTIMATES, LatencyBudget, LatencyEstimator
+from src.backend_api.cancellation import (
+    ActiveRequests,
+    CancelToken,
+    RequestCancelled,
+    cancellable,
+    check_cancelled,
+    current_cancel,
+    remaining_seconds,
+)
+from src.backend_api.trace import RequestTrace
+
+
+def new_token(seconds=30):
+    return CancelToken(LatencyBudget(seconds), RequestTrace())
+
+
+def counter(name):
+    return metrics.snapshot().get(name, 0)
+
+
+def test_new_request_supersedes_the_one_in_flight():
+    active = ActiveRequests()
+    first, second = new_token(), new_token()
+    superseded = counter("requests.cancelled.superseded")
+
+    active.begin("s1", first)
+    active.begin("s1", second)
+    assert first.cancelled and first.reason == "superseded"
+    assert not second.cancelled
+    assert counter("requests.cancelled.superseded") == superseded + 1
+
+    # A late end() of the superseded request leaves the newer one registered
+    active.end("s1", first)
+    third = new_token()
+    active.begin("s1", third)
+    assert second.cancelled and not third.cancelled
+
+
+def test_requests_without_a_session_never_supersede():
+    active = ActiveRequests()
+    first, second = new_token(), new_token()
+    active.begin(None, first)
+    active.begin(None, second)
+    assert not first.cancelled and not second.cancelled
+
+
+def test_only_the_first_cancel_counts():
+    token = new_token()
+    token.cancel("disconnect")
+    token.cancel("superseded")
+    assert token.reason == "disconnect"
+
+
+def test_worker_code_stops_at_the_next_check():
+    token = new_token()
+    reset = current_cancel.set(token)
+    try:
+        check_cancelled()
+        chunks = cancellable(iter(["a", "b", "c"]))
+        assert next(chunks) == "a"
+        token.cancel("disconnect")
+        with pytest.raises(RequestCancelled, match="disconnect"):
+            next(chunks)
+        with pytest.raises(RequestCancelled):
+            check_cancelled()
+    finally:
+        current_cancel.reset(reset)
+
+
+def test_remaining_seconds_counts_only_measured_phases(monkeypatch):
+    estimator = LatencyEstimator(DEFAULT_ESTIMATES)
+    monkeypatch.setattr(cancellation, "estimator", estimator)
+    trace = RequestTrace()
+    assert remaining_seconds(trace) == 0.0
+
+    trace.phase, trace.phase_started = "tool", time.monotonic()
+    # Starting guesses are not evidence of time saved
+    assert remaining_seconds(trace) == 0.0
+    estimator.observe("tool", 2.0)
+    estimator.observe("answer", 4.0)
+    assert 5.9 < remaining_seconds(trace) <= 6.0
+
+    trace.phase_started -= 10
+    assert remaining_seconds(trace) == pytest.approx(4.0)
+
+
+def test_cancelling_interrupts_the_pipeline_mid_stream():
+    token = new_token()
+    closed = []
+
+    async def answer():
+        try:
+            yield "first"
+            await asyncio.sleep(30)
+            yield "never"
+        finally:
+            closed.append(True)
+
+    async def consume():
+        chunks = []
+        with pytest.raises(RequestCancelled, match="superseded"):
+            async for chunk in pipeline.within_deadline(answer(), LatencyBudget(30), token):
+                chunks.append(chunk)
+                asyncio.get_running_loop().call_later(0.05, token.cancel, "superseded")
+        return chunks
+
+    assert asyncio.run(asyncio.wait_for(consume(), 5)) == ["first"]
+    assert closed == [True]
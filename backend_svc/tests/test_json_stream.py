@@ -0,0 +1,59 @@
+import json
+
+from src.backend_api.tools.json_stream import first_array_items
+
+
+def chunked(data: bytes, size: int):
+    return iter([data[i:i + size] for i in range(0, len(data), size)])
+
+
+PAYLOAD = json.dumps({
+    "query": "paris weather",
+    "number_of_results": 12345,
+    "results": [{"title": f"Result {i}", "content": "é" * 20, "score": i + 0.5} for i in range(5)],
+    "answers": [],
+}).encode()
+
+
+def test_items_split_across_chunks():
+    # 1-byte chunks split every string, number and multi-byte character
+    for size in (1, 3, 7, 64):
+        items = first_array_items(chunked(PAYLOAD, size), "results", 3, 1 << 20)
+        assert [item["title"] for item in items] == ["Result 0", "Result 1", "Result 2"]
+        assert items[0]["content"] == "é" * 20
+
+
+def test_number_at_chunk_boundary():
+    data = b'{"results": [12345, 6.75]}'
+    # "12" | "345": the first number must not be cut to 12
+    chunks = iter([data[:15], data[15:]])
+    assert first_array_items(chunks, "results", 2, 1 << 20) == [12345, 6.75]
+
+
+def test_numbers_split_at_every_offset():
+    # "6." or "1e" at the end of a chunk is not a complete number yet
+    data = b'{"results": [6.75, 1e3, -2.5E-1, 12345]}'
+    for split in range(1, len(data)):
+        chunks = iter([data[:split], data[split:]])
+        assert first_array_items(chunks, "results", 4, 1 << 20) == [6.75, 1000.0, -0.25, 12345], split
+
+
+def test_stops_at_limit_without_reading_the_rest():
+    chunks = chunked(PAYLOAD + b"this is not JSON", 16)
+    assert len(first_array_items(chunks, "results", 2, 1 << 20)) == 2
+
+
+def test_byte_cap_returns_items_read_so_far():
+    big = json.dumps({"results": [{"content": "x" * 100} for _ in range(50)]}).encode()
+    items = first_array_items(chunked(big, 64), "results", 50, 512)
+    assert 0 < len(items) < 50
+    assert all(item == {"content": "x" * 100} for item in items)
+
+
+def test_missing_key_returns_nothing():
+    data = json.dumps({"query": "q", "answers": [1, 2]}).encode()
+    assert first_array_items(chunked(data, 5), "results", 3, 1 << 20) == []
+
+
+def test_empty_array():
+    assert first_array_items(iter([b'{"results": []}']), "results", 3, 1 << 20) == []
@@ -0,0 +1,20 @@
+from src.backend_api.recorder import anonymize, anonymize_event
+
+
+def test_anonymize_strips_identifying_details():
+    text = ("Mail jane.doe+news@example.co.uk or call +33 1 42 68 53 00 about order 1234567, "
+            "see https://shop.example.com/orders?id=42 from 192.168.0.12")
+    assert anonymize(text) == "Mail <email> or call <phone> about order <number>, see <url> from <ip>"
+
+
+def test_anonymize_keeps_the_wording_that_drives_routing():
+    text = "Weather in Paris on 12 May 2025? Top 10 things to do"
+    assert anonymize(text) == text
+
+
+def test_anonymize_event_only_touches_string_arguments():
+    event = {"k": "tool", "s": 0.8, "name": "searchxng", "args": {"query": "news for bob@example.com", "limit": 5}}
+    assert anonymize_event(event) == {**event, "args": {"query": "news for <email>", "limit": 5}}
+    assert event["args"]["query"] == "news for bob@example.com"
+    route = {"k": "ollama", "s": 0.3}
+    assert anonymize_event(route) is route
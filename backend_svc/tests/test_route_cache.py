@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from src.backend_api import pipeline, route_cache
+from src.backend_api.budget import LatencyBudget
+from src.backend_api.routing import RouteDecision
+from src.backend_api.schemas import ChatRequest
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch, make_cache):
+    monkeypatch.setattr(route_cache, "route_cache", make_cache("route"))
+
+
+def test_route_key_ignores_case_spacing_and_punctuation():
+    assert route_cache.route_key("What's the weather in Paris?", []) == \
+        route_cache.route_key("  what's the WEATHER in paris ", [])
+
+
+def test_follow_ups_are_keyed_by_the_previous_message():
+    follow_up = route_cache.route_key("and tomorrow?", [("Weather in Paris", "Sunny")])
+    assert follow_up != route_cache.route_key("and tomorrow?", [])
+    assert follow_up != route_cache.route_key("and tomorrow?", [("Weather in Rome", "Rain")])
+    # Only the question counts, not how it was answered
+    assert follow_up == route_cache.route_key("and tomorrow?", [("weather in paris", "Cloudy")])
+
+
+def test_only_the_choice_is_remembered():
+    assert route_cache.cached_decision("Weather in Paris", []) is None
+    weather = RouteDecision(tool="get_weather", arguments={"location": "Paris"})
+    route_cache.remember_decision("Weather in Paris", [], weather)
+    route_cache.remember_decision("Hi", [], RouteDecision(tool=None, content="Hello!"))
+    assert route_cache.cached_decision("weather in paris!", []) == weather
+    assert route_cache.cached_decision("Hi", []) == RouteDecision(tool=None)
+
+
+def test_repeated_question_skips_the_routing_call(monkeypatch):
+    monkeypatch.setattr(pipeline, "ROUTE_CACHE_ENABLED", True)
+    routed = []
+
+    def call_ollama(messages, tools=None, profile=None):
+        routed.append(messages)
+        return {"message": {"role": "assistant", "content": "",
+                            "tool_calls": [{"function": {"name": "get_date", "arguments": {}}}]}}
+
+    def stream_ollama(messages, profile=None):
+        yield "Monday."
+
+    monkeypatch.setattr(pipeline, "call_ollama", call_ollama)
+    monkeypatch.setattr(pipeline, "dispatch_tool", lambda name, arguments: "2026-10-19")
+    monkeypatch.setattr(pipeline, "stream_ollama", stream_ollama)
+
+    async def ask(message):
+        used_tools = []
+        request = ChatRequest(message=message, history=[])
+        answer = "".join([c async for c in pipeline.run_tools(request, LatencyBudget(30), used_tools)])
+        return answer, used_tools
+
+    assert asyncio.run(ask("What day is it?")) == ("Monday.", ["get_date"])
+    assert asyncio.run(ask("what day is it")) == ("Monday.", ["get_date"])
+    assert len(routed) == 1
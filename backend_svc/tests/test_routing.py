@@ -0,0 +1,44 @@
+import json
+
+from src.backend_api.routing import RouteDecision, parse_batch_decisions
+
+
+def reply(*decisions) -> str:
+    return json.dumps({"decisions": list(decisions)})
+
+
+def test_parse_batch_decisions():
+    content = reply(
+        {"id": 0, "tool": "get_weather", "location": " Paris "},
+        {"id": 1, "tool": "none"},
+        {"id": 2, "tool": "get_date"},
+        {"id": 3, "tool": "searchxng", "query": "champions league final"},
+    )
+    assert parse_batch_decisions(content, 4) == [
+        RouteDecision(tool="get_weather", arguments={"location": "Paris"}),
+        RouteDecision(tool=None),
+        RouteDecision(tool="get_date", arguments={}),
+        RouteDecision(tool="searchxng", arguments={"query": "champions league final"}),
+    ]
+
+
+def test_incomplete_or_unknown_entries_fall_back():
+    content = reply(
+        {"id": 0, "tool": "get_weather"},  # no location
+        {"id": 1, "tool": "searchxng", "query": "  "},
+        {"id": 2, "tool": "calculator"},
+        {"id": 7, "tool": "none"},  # no such query
+        {"id": "3", "tool": "none"},
+    )
+    assert parse_batch_decisions(content, 4) == [None] * 4
+
+
+def test_first_decision_per_id_wins():
+    content = reply({"id": 0, "tool": "none"}, {"id": 0, "tool": "get_date"})
+    assert parse_batch_decisions(content, 1) == [RouteDecision(tool=None)]
+
+
+def test_unparseable_reply():
+    assert parse_batch_decisions("not json", 2) == [None, None]
+    assert parse_batch_decisions(json.dumps({"decisions": "none"}), 2) == [None, None]
+    assert parse_batch_decisions(json.dumps([1, 2]), 2) == [None, None]
@@ -0,0 +1,63 @@
+import pytest
+
+from src.backend_api.tools import search_fanout
+from src.backend_api.tools.search_fanout import canonical_url, fanout_search, merge_results
+
+
+def test_canonical_url_ignores_presentation_differences():
+    variants = [
+        "https://www.Example.com/news/article/?b=2&a=1",
+        "http://example.com/news/article?a=1&b=2#comments",
+        "https://example.com/news/article?a=1&utm_source=feed&b=2&fbclid=xyz",
+    ]
+    assert len({canonical_url(url) for url in variants}) == 1
+
+
+def test_canonical_url_keeps_meaningful_differences():
+    assert canonical_url("https://example.com/a?id=1") != canonical_url("https://example.com/a?id=2")
+    assert canonical_url("https://example.com/a") != canonical_url("https://example.com/b")
+
+
+def test_merge_results_adds_scores_and_keeps_longest_snippet():
+    merged = {}
+    merge_results(merged, [
+        {"url": "https://www.example.com/page/", "content": "short", "score": 1.0, "engines": ["bing"]},
+        {"url": "https://other.org/", "content": "other", "score": 0.5, "engines": ["bing"]},
+    ])
+    merge_results(merged, [
+        {"url": "http://example.com/page?utm_medium=x", "content": "a longer snippet", "score": 2.0,
+         "engines": ["duckduckgo"]},
+    ])
+    assert len(merged) == 2
+    page = merged[canonical_url("https://example.com/page")]
+    assert page["score"] == 3.0
+    assert page["engines"] == ["bing", "duckduckgo"]
+    assert page["content"] == "a longer snippet"
+
+
+def test_merge_results_scores_by_rank_when_missing():
+    merged = {}
+    merge_results(merged, [{"url": "https://a.com"}, {"url": "https://b.com"}])
+    assert merged[canonical_url("https://a.com")]["score"] == 1.0
+    assert merged[canonical_url("https://b.com")]["score"] == 0.5
+
+
+def test_fanout_merges_engines_and_skips_failed_ones(monkeypatch):
+    def fetch(query, limit, params, timeout):
+        if params == {"engines": "broken"}:
+            raise ConnectionError("engine down")
+        snippet = "x" * search_fanout.MIN_SNIPPET_CHARS
+        return [{"url": f"https://{params['engines']}.com", "content": snippet, "score": 1.0}]
+
+    monkeypatch.setattr(search_fanout, "fetch_results", fetch)
+    results = fanout_search("query", limit=5, targets=["bing", "broken", "duckduckgo"], budget_seconds=5)
+    assert sorted(r["url"] for r in results) == ["https://bing.com", "https://duckduckgo.com"]
+
+
+def test_fanout_raises_when_every_target_fails(monkeypatch):
+    def fetch(query, limit, params, timeout):
+        raise ConnectionError(f"{params} down")
+
+    monkeypatch.setattr(search_fanout, "fetch_results", fetch)
+    with pytest.raises(ConnectionError):
+        fanout_search("query", limit=5, targets=["a", "b"], budget_seconds=5)
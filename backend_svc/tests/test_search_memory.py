@@ -0,0 +1,52 @@
+from src.backend_api.search_memory import PassageIndex, SearchMemory, chunk_text
+
+EIFFEL = {"title": "Eiffel Tower", "url": "https://a.example",
+          "content": "The Eiffel Tower is 330 metres tall. It was finished in 1889."}
+LOUVRE = {"title": "Louvre", "url": "https://b.example",
+          "content": "The Louvre is the most visited museum in the world."}
+
+
+def test_chunk_text_keeps_whole_sentences():
+    text = "First sentence here. Second one! Third, a question? Fourth."
+    assert chunk_text(text, max_chars=35) == ["First sentence here. Second one!", "Third, a question? Fourth."]
+    assert chunk_text("") == []
+
+
+def test_recall_needs_most_query_words():
+    memory = SearchMemory(capacity=16, max_age=60)
+    memory.remember([EIFFEL, LOUVRE])
+    assert memory.recall("how tall is the eiffel tower") == [EIFFEL]
+    assert memory.recall("eiffel tower opening hours tickets") == []
+    assert memory.recall("the of and") == []
+
+
+def test_best_bm25_score_first():
+    index = PassageIndex(capacity=16, max_age=60)
+    index.add("Paris", "https://a.example", "Paris weather today.")
+    index.add("Paris weather", "https://b.example", "Weather in Paris: Paris weather forecast.")
+    index.add("Rome", "https://c.example", "Rome weather today.")
+    assert [p["url"] for p in index.search("paris weather")] == ["https://b.example", "https://a.example"]
+
+
+def test_slots_are_reused_oldest_first():
+    index = PassageIndex(capacity=2, max_age=60)
+    index.add("", "https://a.example", "alpha passage")
+    index.add("", "https://b.example", "beta passage")
+    index.add("", "https://c.example", "gamma passage")
+    assert index.search("alpha passage") == []
+    assert [p["url"] for p in index.search("gamma passage")] == ["https://c.example"]
+    assert "alpha" not in index.postings
+
+
+def test_readding_a_passage_refreshes_it():
+    index = PassageIndex(capacity=2, max_age=60)
+    index.add("", "https://a.example", "alpha passage")
+    index.add("", "https://a.example", "alpha passage")
+    assert sum(p is not None for p in index.passages) == 1
+
+
+def test_stale_passages_are_ignored():
+    index = PassageIndex(capacity=4, max_age=60)
+    index.add("", "https://a.example", "alpha passage")
+    index.added_at[:] -= 120
+    assert index.search("alpha passage") == []
@@ -0,0 +1,64 @@
+import asyncio
+
+from src.backend_api import pipeline
+from src.backend_api.budget import LatencyBudget
+from src.backend_api.schemas import ChatRequest
+from src.backend_api.semantic_cache import SemanticAnswerCache
+
+FRANCE = [1.0, 0.0, 0.0]
+FRANCE_REWORDED = [0.98, 0.1, 0.05]
+TOLSTOY = [0.0, 1.0, 0.0]
+
+
+def test_near_duplicate_question_is_served_from_cache():
+    cache = SemanticAnswerCache(capacity=8, ttl=60, threshold=0.9)
+    cache.store(FRANCE, "What is the capital of France?", "Paris.")
+    assert cache.lookup(FRANCE_REWORDED) == "Paris."
+    assert cache.lookup(TOLSTOY) is None
+
+
+def test_expired_answers_do_not_match():
+    cache = SemanticAnswerCache(capacity=8, ttl=-1, threshold=0.9)
+    cache.store(FRANCE, "capital of France", "Paris.")
+    assert cache.lookup(FRANCE) is None
+
+
+def test_oldest_answer_is_overwritten_when_full():
+    cache = SemanticAnswerCache(capacity=2, ttl=60, threshold=0.9)
+    for vector, answer in ((FRANCE, "Paris."), (TOLSTOY, "Tolstoy."), ([0.0, 0.0, 1.0], "Madrid.")):
+        cache.store(vector, "question", answer)
+    assert cache.lookup(FRANCE) is None
+    assert cache.lookup([0.0, 0.0, 1.0]) == "Madrid."
+
+
+def test_changed_embedding_size_starts_over():
+    cache = SemanticAnswerCache(capacity=4, ttl=60, threshold=0.9)
+    cache.store(FRANCE, "q", "Paris.")
+    cache.store([1.0, 0.0], "q", "Two dimensions.")
+    assert cache.lookup(FRANCE) is None
+    assert cache.lookup([1.0, 0.0]) == "Two dimensions."
+
+
+def test_pipeline_answers_standalone_questions_from_the_cache(monkeypatch):
+    cache = SemanticAnswerCache(capacity=8, ttl=60, threshold=0.9)
+    vectors = {"What is the capital of France?": FRANCE, "capital of france?": FRANCE_REWORDED}
+    monkeypatch.setattr(cache, "embed", vectors.get)
+    monkeypatch.setattr(pipeline, "answer_cache", cache)
+    monkeypatch.setattr(pipeline, "SEMANTIC_CACHE_ENABLED", True)
+    generated = []
+
+    async def run_tools(request, budget, used_tools):
+        generated.append(request.message)
+        yield "Paris."
+
+    monkeypatch.setattr(pipeline, "run_tools", run_tools)
+
+    async def ask(message, history=()):
+        request = ChatRequest(message=message, history=list(history))
+        return "".join([c async for c in pipeline.stream_answer(request, LatencyBudget(30))])
+
+    assert asyncio.run(ask("What is the capital of France?")) == "Paris."
+    assert asyncio.run(ask("capital of france?")) == "Paris."
+    # Follow-ups depend on the conversation and are never served from the cache
+    assert asyncio.run(ask("capital of france?", [("hi", "hello")])) == "Paris."
+    assert generated == ["What is the capital of France?", "capital of france?"]
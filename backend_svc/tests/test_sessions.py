@@ -0,0 +1,78 @@
+import asyncio
+
+from src.backend_api import pipeline
+from src.backend_api.budget import LatencyBudget
+from src.backend_api.schemas import ChatRequest
+from src.backend_api.sessions import SessionStore
+
+SYSTEM = {"role": "system", "content": "You are helpful."}
+HI = {"role": "user", "content": "Hi"}
+
+
+def store(**overrides):
+    return SessionStore(**{"max_sessions": 4, "ttl": 60, "max_chars": 10_000, **overrides})
+
+
+def test_next_turn_extends_the_saved_messages():
+    sessions = store()
+    sessions.save("s1", [SYSTEM, HI], [], "Hi")
+    assert sessions.transcript("s1", [("Hi", "Hello!")]) == [
+        SYSTEM, HI, {"role": "assistant", "content": "Hello!"},
+    ]
+
+
+def test_diverging_history_starts_over():
+    sessions = store()
+    sessions.save("s1", [SYSTEM, HI], [], "Hi")
+    # An edited message drops the session
+    assert sessions.transcript("s1", [("Hey", "Hello!")]) is None
+    assert sessions.transcript("s1", [("Hi", "Hello!")]) is None
+    # So does a turn the store never saw
+    sessions.save("s1", [SYSTEM, HI], [], "Hi")
+    assert sessions.transcript("s1", [("x", "y"), ("Hi", "Hello!")]) is None
+    assert sessions.transcript("unknown", [("Hi", "Hello!")]) is None
+
+
+def test_expired_or_oversized_sessions_are_not_reused():
+    expired = store(ttl=0)
+    expired.save("s1", [SYSTEM, HI], [], "Hi")
+    assert expired.transcript("s1", [("Hi", "Hello!")]) is None
+
+    small = store(max_chars=50)
+    small.save("s1", [SYSTEM, HI], [], "Hi")
+    assert small.transcript("s1", [("Hi", "Hello!")]) is None
+
+
+def test_least_recently_used_session_is_dropped():
+    sessions = store(max_sessions=2)
+    sessions.save("s1", [HI], [], "Hi")
+    sessions.save("s2", [HI], [], "Hi")
+    sessions.transcript("s1", [("Hi", "Hello!")])
+    sessions.save("s3", [HI], [], "Hi")
+    assert sessions.transcript("s2", [("Hi", "Hello!")]) is None
+    assert sessions.transcript("s1", [("Hi", "Hello!")]) is not None
+
+
+def test_pipeline_sends_the_previous_turn_as_prefix(monkeypatch):
+    monkeypatch.setattr(pipeline, "SESSION_REUSE_ENABLED", True)
+    monkeypatch.setattr(pipeline, "sessions", store())
+    routed = []
+
+    def call_ollama(messages, tools=None, profile=None):
+        routed.append(list(messages))
+        return {"message": {"role": "assistant", "content": f"Answer {len(routed)}"}}
+
+    monkeypatch.setattr(pipeline, "call_ollama", call_ollama)
+
+    async def ask(message, history):
+        request = ChatRequest(message=message, history=history, session_id="s1")
+        return "".join([c async for c in pipeline.run_tools(request, LatencyBudget(30), [])])
+
+    assert asyncio.run(ask("Hi", [])) == "Answer 1"
+    assert asyncio.run(ask("And you?", [("Hi", "Answer 1")])) == "Answer 2"
+    first, second = routed
+    assert second[:len(first)] == first
+    assert second[len(first):] == [
+        {"role": "assistant", "content": "Answer 1"},
+        {"role": "user", "content": "And you?"},
+    ]
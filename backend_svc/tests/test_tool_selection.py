@@ -0,0 +1,51 @@
+import asyncio
+
+from src.backend_api import pipeline
+from src.backend_api.budget import LatencyBudget
+from src.backend_api.schemas import ChatRequest
+from src.backend_api.tool_selection import FALLBACK_TOOL, select_tools
+
+
+def test_search_is_always_offered():
+    assert select_tools("Who won the Champions League?") == [FALLBACK_TOOL]
+    assert FALLBACK_TOOL in select_tools("What's the weather in Paris?")
+
+
+def test_keywords_pick_the_matching_tool():
+    assert select_tools("Will it rain in Paris tomorrow?") == ["get_weather", FALLBACK_TOOL]
+    assert select_tools("What day is it?") == ["get_date", FALLBACK_TOOL]
+
+
+def test_single_weak_keyword_is_not_enough():
+    # "wind" alone scores 1, below the threshold
+    assert select_tools("Who wrote Gone with the Wind") == [FALLBACK_TOOL]
+
+
+def test_follow_ups_use_the_previous_message():
+    history = [("What's the weather in Paris?", "Sunny, 25°C")]
+    assert select_tools("and in Rome?", history) == ["get_weather", FALLBACK_TOOL]
+
+
+def test_limit_keeps_the_best_scoring_tools():
+    message = "Forecast and temperature for the day of the match"
+    assert select_tools(message, limit=3) == ["get_weather", "get_date", FALLBACK_TOOL]
+    assert select_tools(message, limit=2) == ["get_weather", FALLBACK_TOOL]
+    assert select_tools(message, limit=1) == [FALLBACK_TOOL]
+
+
+def test_routing_call_offers_only_the_selected_tools(monkeypatch):
+    monkeypatch.setattr(pipeline, "TOOL_SUBSET_ENABLED", True)
+    offered = []
+
+    def call_ollama(messages, tools=None, profile=None):
+        offered.append([t["function"]["name"] for t in tools])
+        return {"message": {"role": "assistant", "content": "Sunny."}}
+
+    monkeypatch.setattr(pipeline, "call_ollama", call_ollama)
+
+    async def ask(message):
+        request = ChatRequest(message=message, history=[])
+        return "".join([c async for c in pipeline.run_tools(request, LatencyBudget(30), [])])
+
+    asyncio.run(ask("Is it sunny in Paris?"))
+    assert offered == [["get_weather", FALLBACK_TOOL]]
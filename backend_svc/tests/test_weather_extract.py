@@ -0,0 +1,38 @@
+from src.backend_api.tools.weather_extract import extract_fields, extract_weather
+
+
+def test_extract_fields():
+    text = ("Paris, France: Partly cloudy, 18°C. Humidity: 64%. Wind NW at 12 km/h. "
+            "Tonight: low of 11°C, tomorrow high 21 °C.")
+    assert extract_fields(text) == {
+        "temperature": "18°C",
+        "conditions": "partly cloudy",
+        "humidity": "64%",
+        "wind": "12 km/h NW",
+        "forecast": "high 21°C, low 11°C",
+    }
+
+
+def test_extract_fields_units_and_decimals():
+    fields = extract_fields("Currently 64.5 degrees F, 80% humidity, winds 5 mph")
+    assert fields["temperature"] == "64.5°F"
+    assert fields["humidity"] == "80%"
+    assert fields["wind"] == "5 mph"
+
+
+def test_extract_fields_ignores_lookalikes():
+    assert extract_fields("Upgrade to Windows 8 mph edition") == {}
+    assert extract_fields("Top 10 things to do in Paris") == {}
+
+
+def test_extract_weather_takes_each_field_from_the_best_ranked_snippet():
+    results = [
+        {"title": "Paris weather", "content": "Sunny, 25°C", "url": "https://a.example"},
+        {"title": "Paris forecast", "content": "Rain, 19°C, humidity 70%", "url": "https://b.example"},
+        {"title": "Paris news", "content": "Nothing about weather", "url": "https://c.example"},
+    ]
+    record = extract_weather("Paris", results)
+    assert record["temperature"] == "25°C"
+    assert record["conditions"] == "sunny"
+    assert record["humidity"] == "70%"
+    assert record["sources"] == ["https://a.example", "https://b.example"]
@@ -1,36 +1,89 @@
+import json
+import os
+import uuid
+
 import gradio as gr
-import requests
+import httpx
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://backend_svc:8000/chat")  # Adjust as needed
+BACKEND_STREAM_URL = os.getenv("BACKEND_STREAM_URL", BACKEND_URL + "/stream")
+# Seconds to wait for the backend between streamed chunks
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "120"))
+# Deadline for a whole answer, passed to the backend (unset = backend default)
+CHAT_DEADLINE_SECONDS = os.getenv("CHAT_DEADLINE_SECONDS")
+# Chat handlers Gradio runs at the same time (also the size of the connection pool)
+GRADIO_CONCURRENCY = int(os.getenv("GRADIO_CONCURRENCY", "32"))
+
+_client = None
+
 
-BACKEND_URL = "http://backend_svc:8000/chat"  # Adjust as needed
+def get_client() -> httpx.AsyncClient:
+    # Created lazily so it binds to the event loop Gradio runs handlers on
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(BACKEND_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=GRADIO_CONCURRENCY,
+                max_keepalive_connections=GRADIO_CONCURRENCY
+            )
+        )
+    return _client
 
-def chat_with_backend(message, history):
+
+async def chat_with_backend(message, history, session_id):
     debug_logs = []
     debug_logs.append(f"Sending message to backend: {message}")
-    data = {"message": message, "history": history}
+    data = {"message": message, "history": history, "session_id": session_id}
+    if CHAT_DEADLINE_SECONDS:
+        data["timeout_seconds"] = float(CHAT_DEADLINE_SECONDS)
+
+    # Show the user's message immediately, then fill in the answer as it streams
+    history = history + [(message, "")]
+    yield history, history, "\n".join(debug_logs)
+
+    backend_resp = ""
     try:
-        response = requests.post(BACKEND_URL, json=data)
-        response.raise_for_status()
-        backend_resp = response.json().get("response", "No response")
+        async with get_client().stream("POST", BACKEND_STREAM_URL, json=data) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get("code") == "cancelled":
+                    # A newer message took over; keep what arrived so far
+                    debug_logs.append(event["error"])
+                    break
+                if "error" in event:
+                    raise RuntimeError(event["error"])
+                if "delta" in event:
+                    backend_resp += event["delta"]
+                    history[-1] = (message, backend_resp)
+                    yield history, history, "\n".join(debug_logs)
         debug_logs.append(f"Received backend response: {backend_resp}")
     except Exception as e:
         backend_resp = f"Error: {str(e)}"
         debug_logs.append(f"Error calling backend: {str(e)}")
 
-    history = history + [(message, backend_resp)]
+    history[-1] = (message, backend_resp)
     debug_log_text = "\n".join(debug_logs)
-    return history, history, debug_log_text
+    yield history, history, debug_log_text
 
 
 with gr.Blocks() as demo:
     chatbot = gr.Chatbot()
     msg = gr.Textbox(placeholder="Type your message here")
     state = gr.State([])
+    # One id per browser session, so the backend can reuse the conversation's context
+    session = gr.State(lambda: uuid.uuid4().hex)
     debug_output = gr.Textbox(label="Debug Log", interactive=False, lines=10)
 
-    # Inputs: message textbox, chat history
+    # Inputs: message textbox, chat history, session id
     # Outputs: chatbot messages, updated history state, debug log textbox
-    msg.submit(chat_with_backend, inputs=[msg, state], outputs=[chatbot, state, debug_output])
+    msg.submit(chat_with_backend, inputs=[msg, state, session], outputs=[chatbot, state, debug_output])
     msg.submit(lambda: "", [], msg)  # Clear input box after submit
 
+demo.queue(default_concurrency_limit=GRADIO_CONCURRENCY)
+
 if __name__ == "__main__":
     demo.launch(server_name="0.0.0.0", server_port=7860)